@@ -1,6 +1,6 @@
 import os
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Dict, List, Optional
 
 class Settings(BaseSettings):
     # Database
@@ -9,6 +9,34 @@ class Settings(BaseSettings):
     # Redis
     REDIS_URL: str = "redis://localhost:6379"
     
+    # Idempotent submissions
+    IDEMPOTENCY_TTL_SECONDS: int = 3600
+    IDEMPOTENCY_LOCK_SECONDS: int = 60
+    
+    # Rate limiting & admission control
+    RATE_LIMIT_PER_MINUTE: int = 120
+    RATE_LIMIT_BURST: int = 30
+    # Only requests arriving from these addresses may name the caller via X-User-Id / X-Forwarded-For
+    RATE_LIMIT_TRUSTED_PROXIES: List[str] = []
+    ADMISSION_MAX_CONCURRENCY: int = 64
+    ADMISSION_LIMITS: Dict[str, int] = {"writes": 16, "staff": 16, "reads": 32, "uploads": 8}
+    ADMISSION_RESERVED_HIGH: int = 8
+    ADMISSION_MAX_QUEUE: int = 200
+    ADMISSION_QUEUE_TIMEOUT: float = 5.0
+    EMERGENCY_CATEGORIES: List[str] = ["water"]
+    
+    # Ward routing
+    WARD_BOUNDARIES_PATH: Optional[str] = "./data/wards.geojson"
+    WARD_RELOAD_INTERVAL: float = 30.0
+    
+    # Hotspot forecasting (ml-services)
+    ML_SERVICE_URL: str = "http://localhost:8001"
+    HOTSPOT_FEED_ENABLED: bool = True
+    HOTSPOT_FEED_INTERVAL: float = 2.0
+    HOTSPOT_FEED_BATCH_SIZE: int = 500
+    # Must match HOTSPOT_RESET_TOKEN in ml-services; only the bootstrap resets the grid
+    HOTSPOT_RESET_TOKEN: Optional[str] = None
+    
     # Blockchain
     WEB3_PROVIDER_URL: str = "https://polygon-mumbai.g.alchemy.com/v2/your-api-key"
     PRIVATE_KEY: Optional[str] = None
@@ -31,13 +59,30 @@ class Settings(BaseSettings):
     # ML Models
     MODEL_PATH: str = "./models"
     
+    # Image preprocessing
+    IMAGE_WORKERS: int = 2
+    THUMBNAIL_SIZE: int = 320
+    MODEL_INPUT_SIZE: int = 224
+    WEBP_QUALITY: int = 80
+    
     # Notification
     TWILIO_ACCOUNT_SID: Optional[str] = None
     TWILIO_AUTH_TOKEN: Optional[str] = None
+    TWILIO_FROM_NUMBER: Optional[str] = None
+    TWILIO_API_URL: str = "https://api.twilio.com"
     SMTP_SERVER: str = "smtp.gmail.com"
     SMTP_PORT: int = 587
+    SMTP_USE_TLS: bool = True
     EMAIL_USERNAME: Optional[str] = None
     EMAIL_PASSWORD: Optional[str] = None
+    EMAIL_FROM: Optional[str] = None
+    
+    # Notification dispatch
+    NOTIFICATION_WORKER_ENABLED: bool = False
+    NOTIFICATION_BATCH_SIZE: int = 100
+    NOTIFICATION_POLL_INTERVAL: float = 2.0
+    NOTIFICATION_MAX_ATTEMPTS: int = 5
+    NOTIFICATION_SMS_CONCURRENCY: int = 10
     
     class Config:
         env_file = ".env"
@@ -78,6 +78,8 @@ class Report(Base):
     
     # Media
     image_urls = Column(Text, nullable=True)  # JSON array of URLs
+    thumbnail_urls = Column(Text, nullable=True)  # JSON array, aligned with image_urls
+    image_hashes = Column(Text, nullable=True)  # JSON array of perceptual hashes, aligned with image_urls
     ipfs_hash = Column(String(100), nullable=True)
     
     # Status Tracking
@@ -120,6 +122,24 @@ class StatusUpdate(Base):
     # Relationships
     report = relationship("Report", back_populates="status_updates")
 
+class NotificationOutbox(Base):
+    __tablename__ = "notification_outbox"
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    channel = Column(String(20))  # sms, email
+    recipient = Column(String(255))
+    subject = Column(String(255), nullable=True)
+    message = Column(Text)
+    dedup_key = Column(String(255), unique=True, index=True)
+    
+    # Delivery tracking
+    status = Column(String(20), default="pending", index=True)  # pending, sending, sent, failed
+    attempts = Column(Integer, default=0)
+    next_attempt_at = Column(DateTime, default=datetime.utcnow, index=True)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    sent_at = Column(DateTime, nullable=True)
+
 # Database dependency
 def get_db() -> Session:
     db = SessionLocal()
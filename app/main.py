@@ -1,24 +1,35 @@
-from fastapi import FastAPI, Depends, HTTPException, UploadFile, File, Form
+from fastapi import FastAPI, Depends, HTTPException, UploadFile, File, Form, Header, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
+from starlette.datastructures import Headers
 from typing import List, Optional
-import uvicorn
+from functools import lru_cache
 import logging
+import asyncio
+import hashlib
+import io
+import json
+import os
 
-from .database import get_db, create_tables
+from .database import get_db
 from .models.schemas import (
     ReportCreate, ReportResponse, ReportUpdate,
     UserCreate, UserResponse,
     DepartmentCreate, DepartmentResponse,
     StaffCreate, StaffResponse,
-    AnalyticsResponse, FileUploadResponse
+    AnalyticsResponse, FileUploadResponse,
+    WardLookupRequest, WardLookupResult
 )
-from .services.report_service import ReportService
-from .services.user_service import UserService
-from .services.ai_service import AIService
-from .services.blockchain_service import BlockchainService
-from .services.file_service import FileService
+from .services.image_processor import ImageProcessor
+from .services.idempotency import IdempotencyStore, IdempotencyConflict, IdempotencyInProgress
+from .services.rate_limiter import RateLimiter, retry_after_header
+from .services.admission import AdmissionController, AdmissionRejected, Priority
+from .services.ward_index import WardIndex, WardBoundaryError
+from .services.notification_outbox import install_outbox_listener, outbox_stats
+from .services.notification_dispatcher import NotificationDispatcher
+from .services.hotspot_feed import HotspotFeed
+from .config import settings
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -31,31 +42,184 @@ app = FastAPI(
     version="1.0.0"
 )
 
-# CORS middleware
+# Initialize services
+# Domain services are built on first use so their heavy optional dependencies
+# (torch/transformers, web3, boto3/IPFS) stay off the import and startup path
+@lru_cache(maxsize=None)
+def get_report_service():
+    from .services.report_service import ReportService
+    return ReportService()
+
+@lru_cache(maxsize=None)
+def get_user_service():
+    from .services.user_service import UserService
+    return UserService()
+
+@lru_cache(maxsize=None)
+def get_blockchain_service():
+    from .services.blockchain_service import BlockchainService
+    return BlockchainService()
+
+@lru_cache(maxsize=None)
+def get_file_service():
+    from .services.file_service import FileService
+    return FileService()
+
+_ai_service = None
+_ai_service_lock = asyncio.Lock()
+
+async def get_ai_service():
+    """AI service with its models loaded; the first caller pays the load"""
+    global _ai_service
+    if _ai_service is None:
+        async with _ai_service_lock:
+            if _ai_service is None:
+                from .services.ai_service import AIService
+                service = AIService()
+                await service.load_models()
+                logger.info("AI models loaded successfully")
+                _ai_service = service
+    return _ai_service
+
+image_processor = ImageProcessor()
+idempotency_store = IdempotencyStore()
+rate_limiter = RateLimiter()
+admission_controller = AdmissionController()
+ward_index = WardIndex()
+notification_dispatcher = NotificationDispatcher()
+hotspot_feed = HotspotFeed()
+install_outbox_listener()
+
+# Rate limiting & admission control
+def rate_limit_identity(request: Request) -> str:
+    """Client IP, or the caller named by a trusted proxy; client headers alone are never trusted"""
+    client_ip = request.client.host if request.client else "unknown"
+    if client_ip not in settings.RATE_LIMIT_TRUSTED_PROXIES:
+        return client_ip
+    user_id = request.headers.get("X-User-Id")
+    if user_id:
+        return f"user:{user_id}"
+    forwarded_for = request.headers.get("X-Forwarded-For")
+    return forwarded_for.split(",")[0].strip() if forwarded_for else client_ip
+
+@app.middleware("http")
+async def rate_limit(request: Request, call_next):
+    """Token-bucket limit per client IP (or proxy-verified user)"""
+    if request.url.path == "/health" or request.method == "OPTIONS":
+        return await call_next(request)
+    
+    allowed, retry_after = await rate_limiter.acquire(rate_limit_identity(request))
+    if not allowed:
+        return JSONResponse(
+            status_code=429,
+            content={"detail": "Rate limit exceeded"},
+            headers=retry_after_header(retry_after)
+        )
+    return await call_next(request)
+
+# CORS middleware, added last so it wraps the rate limiter: preflights are answered
+# before any token is spent and 429 responses still carry CORS headers
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],  # Configure appropriately for production
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Retry-After"],
 )
 
-# Initialize services
-report_service = ReportService()
-user_service = UserService()
-ai_service = AIService()
-blockchain_service = BlockchainService()
-file_service = FileService()
+@app.exception_handler(AdmissionRejected)
+async def admission_rejected_handler(request: Request, exc: AdmissionRejected):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc)},
+        headers=retry_after_header(exc.retry_after)
+    )
+
+def admit(route_class: str, priority: Priority = Priority.NORMAL):
+    """Dependency that holds an admission slot for the rest of the request"""
+    async def dependency():
+        async with admission_controller.slot(route_class, priority):
+            yield
+    return dependency
+
+async def admit_report(category: str = Form(...)):
+    """Emergency-category reports jump the submission queue"""
+    priority = Priority.HIGH if category in settings.EMERGENCY_CATEGORIES else Priority.NORMAL
+    async with admission_controller.slot("writes", priority):
+        yield
 
 @app.on_event("startup")
 async def startup_event():
-    """Initialize database and services on startup"""
-    create_tables()
-    logger.info("Database tables created successfully")
+    """Initialize lightweight services on startup; schema changes run via `alembic upgrade head`"""
+    # Build the ward boundary index used to route new reports
+    try:
+        await asyncio.to_thread(ward_index.load)
+    except WardBoundaryError as e:
+        logger.error(f"Ward routing disabled: {str(e)}")
+    
+    # Dedicated workers run `python -m app.services.notification_dispatcher` instead
+    # The event loop only holds weak references to tasks, so keep them on app.state
+    app.state.notification_task = None
+    if settings.NOTIFICATION_WORKER_ENABLED:
+        app.state.notification_task = asyncio.create_task(notification_dispatcher.run_forever())
     
-    # Initialize AI models
-    await ai_service.load_models()
-    logger.info("AI models loaded successfully")
+    # Stream new reports into the ML hotspot grid
+    app.state.hotspot_feed_task = None
+    if settings.HOTSPOT_FEED_ENABLED:
+        app.state.hotspot_feed_task = asyncio.create_task(hotspot_feed.run_forever())
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Release worker pools"""
+    image_processor.shutdown()
+    if app.state.notification_task is not None:
+        # run_forever closes the SMTP and HTTP connections once it sees the stop
+        notification_dispatcher.stop()
+        await app.state.notification_task
+    if app.state.hotspot_feed_task is not None:
+        hotspot_feed.stop()
+        await app.state.hotspot_feed_task
+
+def _bytes_upload(data: bytes, filename: str, content_type: str) -> UploadFile:
+    return UploadFile(
+        file=io.BytesIO(data),
+        size=len(data),
+        filename=filename,
+        headers=Headers({"content-type": content_type})
+    )
+
+async def store_upload(file: UploadFile) -> FileUploadResponse:
+    """Upload a file; images are stripped of EXIF and stored with thumbnail/model variants"""
+    file_service = get_file_service()
+    if not (file.content_type or "").startswith("image/"):
+        return await file_service.upload_file(file)
+    
+    try:
+        processed = await image_processor.process(await file.read())
+    except OSError as e:
+        # Formats Pillow cannot decode (HEIC, SVG, truncated files) are stored as-is;
+        # PIL's UnidentifiedImageError is an OSError
+        logger.warning(f"Storing {file.filename} without image variants: {str(e)}")
+        await file.seek(0)
+        return await file_service.upload_file(file)
+    
+    stem = os.path.splitext(file.filename or "image")[0]
+    extension = processed.original_format.lower()
+    
+    original, thumbnail, model_input = await asyncio.gather(
+        file_service.upload_file(_bytes_upload(processed.original, f"{stem}.{extension}", f"image/{extension}")),
+        file_service.upload_file(_bytes_upload(processed.thumbnail, f"{stem}_thumb.webp", "image/webp")),
+        file_service.upload_file(_bytes_upload(processed.model_input, f"{stem}_model.webp", "image/webp"))
+    )
+    
+    return original.model_copy(update={
+        "thumbnail_url": thumbnail.file_url,
+        "inference_input_url": model_input.file_url,
+        "perceptual_hash": processed.perceptual_hash,
+        "width": processed.width,
+        "height": processed.height
+    })
 
 # Health check endpoint
 @app.get("/health")
@@ -63,25 +227,25 @@ async def health_check():
     return {"status": "healthy", "message": "Civic reporting system is running"}
 
 # User endpoints
-@app.post("/api/users/register", response_model=UserResponse)
+@app.post("/api/users/register", response_model=UserResponse, dependencies=[Depends(admit("writes"))])
 async def register_user(user: UserCreate, db: Session = Depends(get_db)):
     """Register a new user (citizen)"""
     try:
-        return await user_service.create_user(db, user)
+        return await get_user_service().create_user(db, user)
     except Exception as e:
         logger.error(f"User registration failed: {str(e)}")
         raise HTTPException(status_code=400, detail=str(e))
 
-@app.get("/api/users/{user_id}", response_model=UserResponse)
+@app.get("/api/users/{user_id}", response_model=UserResponse, dependencies=[Depends(admit("reads"))])
 async def get_user(user_id: str, db: Session = Depends(get_db)):
     """Get user details"""
-    user = await user_service.get_user(db, user_id)
+    user = await get_user_service().get_user(db, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     return user
 
 # Report endpoints
-@app.post("/api/reports", response_model=ReportResponse)
+@app.post("/api/reports", response_model=ReportResponse, dependencies=[Depends(admit_report)])
 async def create_report(
     title: str = Form(...),
     description: str = Form(...),
@@ -93,17 +257,19 @@ async def create_report(
     user_id: Optional[str] = Form(None),
     is_anonymous: bool = Form(False),
     images: List[UploadFile] = File([]),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
     db: Session = Depends(get_db)
 ):
     """Submit a new civic issue report"""
-    try:
+    async def submit() -> dict:
         # Handle file uploads
-        image_urls = []
-        if images:
-            for image in images:
-                if image.filename:
-                    upload_result = await file_service.upload_file(image)
-                    image_urls.append(upload_result.file_url)
+        uploads = await asyncio.gather(*(store_upload(image) for image in images if image.filename))
+        image_urls = [upload.file_url for upload in uploads]
+        # The classifier gets the small model variants; undecodable images fall back to the original
+        analysis_urls = [upload.inference_input_url or upload.file_url for upload in uploads]
+        
+        # Resolve ward and responsible department from the boundary index
+        ward = ward_index.lookup(latitude, longitude, category)
         
         # Create report data
         report_data = ReportCreate(
@@ -113,28 +279,52 @@ async def create_report(
             latitude=latitude,
             longitude=longitude,
             address=address,
-            ward_number=ward_number,
+            ward_number=ward.ward_number if ward else ward_number,
+            assigned_department_id=ward.department_id if ward else None,
             image_urls=image_urls,
+            thumbnail_urls=[upload.thumbnail_url for upload in uploads],
+            image_hashes=[upload.perceptual_hash for upload in uploads],
             is_anonymous=is_anonymous
         )
         
         # Process with AI
-        ai_analysis = await ai_service.analyze_report(report_data, image_urls)
+        ai_service = await get_ai_service()
+        ai_analysis = await ai_service.analyze_report(report_data, analysis_urls)
         
         # Create report
-        report = await report_service.create_report(db, report_data, user_id, ai_analysis)
+        report = await get_report_service().create_report(db, report_data, user_id, ai_analysis)
         
         # Store on blockchain (async)
-        blockchain_service.store_report_async(report)
+        get_blockchain_service().store_report_async(report)
+        
+        # Update the hotspot forecast (batched, off the request path)
+        if settings.HOTSPOT_FEED_ENABLED:
+            hotspot_feed.add(report)
         
         logger.info(f"Report created successfully: {report.id}")
-        return report
+        return ReportResponse.model_validate(report).model_dump(mode="json")
+    
+    try:
+        if not idempotency_key:
+            return await submit()
+        
+        # Retries must carry the same payload; uploads are identified by name and size
+        fingerprint = hashlib.sha256(json.dumps([
+            title, description, category, latitude, longitude, address, ward_number,
+            user_id, is_anonymous, [(image.filename, image.size) for image in images]
+        ]).encode()).hexdigest()
+        scope = user_id or "anonymous"
+        return await idempotency_store.run(f"reports:{scope}:{idempotency_key}", fingerprint, submit)
         
+    except IdempotencyConflict as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except IdempotencyInProgress as e:
+        raise HTTPException(status_code=409, detail=str(e))
     except Exception as e:
         logger.error(f"Report creation failed: {str(e)}")
         raise HTTPException(status_code=400, detail=str(e))
 
-@app.get("/api/reports", response_model=List[ReportResponse])
+@app.get("/api/reports", response_model=List[ReportResponse], dependencies=[Depends(admit("reads", Priority.LOW))])
 async def get_reports(
     skip: int = 0,
     limit: int = 100,
@@ -144,20 +334,20 @@ async def get_reports(
     db: Session = Depends(get_db)
 ):
     """Get reports with filtering options"""
-    return await report_service.get_reports(
+    return await get_report_service().get_reports(
         db, skip=skip, limit=limit, status=status, 
         category=category, department_id=department_id
     )
 
-@app.get("/api/reports/{report_id}", response_model=ReportResponse)
+@app.get("/api/reports/{report_id}", response_model=ReportResponse, dependencies=[Depends(admit("reads"))])
 async def get_report(report_id: str, db: Session = Depends(get_db)):
     """Get specific report details"""
-    report = await report_service.get_report(db, report_id)
+    report = await get_report_service().get_report(db, report_id)
     if not report:
         raise HTTPException(status_code=404, detail="Report not found")
     return report
 
-@app.put("/api/reports/{report_id}", response_model=ReportResponse)
+@app.put("/api/reports/{report_id}", response_model=ReportResponse, dependencies=[Depends(admit("staff", Priority.HIGH))])
 async def update_report(
     report_id: str, 
     update_data: ReportUpdate,
@@ -166,41 +356,80 @@ async def update_report(
 ):
     """Update report status (admin/staff only)"""
     try:
-        report = await report_service.update_report(db, report_id, update_data, staff_id)
+        report = await get_report_service().update_report(db, report_id, update_data, staff_id)
         
         # Update blockchain
         if report.blockchain_tx_hash:
-            blockchain_service.update_report_status_async(report)
+            get_blockchain_service().update_report_status_async(report)
         
         return report
     except Exception as e:
         logger.error(f"Report update failed: {str(e)}")
         raise HTTPException(status_code=400, detail=str(e))
 
-@app.get("/api/reports/{report_id}/status-history")
+@app.get("/api/reports/{report_id}/status-history", dependencies=[Depends(admit("reads"))])
 async def get_report_status_history(report_id: str, db: Session = Depends(get_db)):
     """Get status update history for a report"""
-    return await report_service.get_status_history(db, report_id)
+    return await get_report_service().get_status_history(db, report_id)
 
 # Department endpoints
-@app.post("/api/departments", response_model=DepartmentResponse)
+@app.post("/api/departments", response_model=DepartmentResponse, dependencies=[Depends(admit("writes"))])
 async def create_department(department: DepartmentCreate, db: Session = Depends(get_db)):
     """Create a new department"""
-    return await report_service.create_department(db, department)
+    return await get_report_service().create_department(db, department)
 
-@app.get("/api/departments", response_model=List[DepartmentResponse])
+@app.get("/api/departments", response_model=List[DepartmentResponse], dependencies=[Depends(admit("reads", Priority.LOW))])
 async def get_departments(db: Session = Depends(get_db)):
     """Get all departments"""
-    return await report_service.get_departments(db)
+    return await get_report_service().get_departments(db)
+
+# Ward routing endpoints
+@app.post("/api/wards/lookup", response_model=List[WardLookupResult], dependencies=[Depends(admit("reads", Priority.LOW))])
+async def lookup_wards(request: WardLookupRequest):
+    """Batch ward/department lookup, e.g. for bulk imports"""
+    matches = ward_index.lookup_many(
+        [p.latitude for p in request.points],
+        [p.longitude for p in request.points],
+        [p.category for p in request.points]
+    )
+    return [
+        WardLookupResult(
+            ward_number=m.ward_number if m else None,
+            department_id=m.department_id if m else None
+        )
+        for m in matches
+    ]
+
+@app.post("/api/wards/reload", dependencies=[Depends(admit("writes"))])
+async def reload_wards():
+    """Rebuild the ward index after boundary changes"""
+    try:
+        loaded = await asyncio.to_thread(ward_index.load)
+    except WardBoundaryError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    if not loaded:
+        raise HTTPException(status_code=404, detail="Ward boundaries file not found")
+    return {"status": "reloaded", "wards": ward_index.size}
+
+# Notification endpoints
+@app.get("/api/notifications/metrics", dependencies=[Depends(admit("reads", Priority.LOW))])
+async def get_notification_metrics(db: Session = Depends(get_db)):
+    """Outbox delivery state across all dispatcher workers, plus this process's worker if enabled"""
+    return {
+        "outbox": outbox_stats(db),
+        "in_process_worker": (
+            notification_dispatcher.metrics.snapshot() if settings.NOTIFICATION_WORKER_ENABLED else None
+        )
+    }
 
 # Staff endpoints
-@app.post("/api/staff", response_model=StaffResponse)
+@app.post("/api/staff", response_model=StaffResponse, dependencies=[Depends(admit("writes"))])
 async def create_staff(staff: StaffCreate, db: Session = Depends(get_db)):
     """Create a new staff member"""
-    return await report_service.create_staff(db, staff)
+    return await get_report_service().create_staff(db, staff)
 
 # Analytics endpoints
-@app.get("/api/analytics", response_model=AnalyticsResponse)
+@app.get("/api/analytics", response_model=AnalyticsResponse, dependencies=[Depends(admit("reads", Priority.LOW))])
 async def get_analytics(
     start_date: Optional[str] = None,
     end_date: Optional[str] = None,
@@ -208,44 +437,44 @@ async def get_analytics(
     db: Session = Depends(get_db)
 ):
     """Get analytics and insights"""
-    return await report_service.get_analytics(db, start_date, end_date, department_id)
+    return await get_report_service().get_analytics(db, start_date, end_date, department_id)
 
-@app.get("/api/analytics/hotspots")
+@app.get("/api/analytics/hotspots", dependencies=[Depends(admit("reads", Priority.LOW))])
 async def get_hotspots(
     radius_km: float = 1.0,
     min_reports: int = 5,
     db: Session = Depends(get_db)
 ):
     """Get issue hotspots on the map"""
-    return await report_service.get_hotspots(db, radius_km, min_reports)
+    return await get_report_service().get_hotspots(db, radius_km, min_reports)
 
 # File upload endpoint
-@app.post("/api/upload", response_model=FileUploadResponse)
+@app.post("/api/upload", response_model=FileUploadResponse, dependencies=[Depends(admit("uploads"))])
 async def upload_file(file: UploadFile = File(...)):
     """Upload a file (image/video) to storage"""
     try:
-        return await file_service.upload_file(file)
+        return await store_upload(file)
     except Exception as e:
         logger.error(f"File upload failed: {str(e)}")
         raise HTTPException(status_code=400, detail=str(e))
 
 # Blockchain verification endpoint
-@app.get("/api/reports/{report_id}/verify")
+@app.get("/api/reports/{report_id}/verify", dependencies=[Depends(admit("reads"))])
 async def verify_report_blockchain(report_id: str, db: Session = Depends(get_db)):
     """Verify report data against blockchain"""
     try:
-        report = await report_service.get_report(db, report_id)
+        report = await get_report_service().get_report(db, report_id)
         if not report or not report.blockchain_tx_hash:
             raise HTTPException(status_code=404, detail="Report or blockchain record not found")
         
-        verification = await blockchain_service.verify_report(report)
+        verification = await get_blockchain_service().verify_report(report)
         return verification
     except Exception as e:
         logger.error(f"Blockchain verification failed: {str(e)}")
         raise HTTPException(status_code=400, detail=str(e))
 
 # Search endpoint
-@app.get("/api/search/reports")
+@app.get("/api/search/reports", dependencies=[Depends(admit("reads", Priority.LOW))])
 async def search_reports(
     q: str,
     latitude: Optional[float] = None,
@@ -254,7 +483,8 @@ async def search_reports(
     db: Session = Depends(get_db)
 ):
     """Search reports by text and/or location"""
-    return await report_service.search_reports(db, q, latitude, longitude, radius_km)
+    return await get_report_service().search_reports(db, q, latitude, longitude, radius_km)
 
 if __name__ == "__main__":
+    import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
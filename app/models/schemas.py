@@ -1,11 +1,12 @@
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, Field, field_validator, validator
 from typing import Optional, List
 from datetime import datetime
+import json
 from uuid import UUID
 
 # User Schemas
 class UserCreate(BaseModel):
-    phone_number: str = Field(..., regex=r'^\+?1?\d{9,15}$')
+    phone_number: str = Field(..., pattern=r'^\+?1?\d{9,15}$')
     email: Optional[str] = None
     name: Optional[str] = None
     is_anonymous: bool = False
@@ -26,12 +27,15 @@ class UserResponse(BaseModel):
 class ReportCreate(BaseModel):
     title: str = Field(..., max_length=255)
     description: str
-    category: str = Field(..., regex=r'^(pothole|garbage|streetlight|water|road|other)$')
+    category: str = Field(..., pattern=r'^(pothole|garbage|streetlight|water|road|other)$')
     latitude: float = Field(..., ge=-90, le=90)
     longitude: float = Field(..., ge=-180, le=180)
     address: Optional[str] = None
     ward_number: Optional[str] = None
+    assigned_department_id: Optional[int] = None
     image_urls: Optional[List[str]] = None
+    thumbnail_urls: Optional[List[Optional[str]]] = None  # aligned with image_urls
+    image_hashes: Optional[List[Optional[str]]] = None    # perceptual hashes, aligned with image_urls
     is_anonymous: bool = False
 
 class ReportResponse(BaseModel):
@@ -47,6 +51,8 @@ class ReportResponse(BaseModel):
     address: Optional[str]
     ward_number: Optional[str]
     image_urls: Optional[List[str]]
+    thumbnail_urls: Optional[List[Optional[str]]] = None
+    image_hashes: Optional[List[Optional[str]]] = None
     ipfs_hash: Optional[str]
     status: str
     ai_category_confidence: Optional[float]
@@ -56,11 +62,17 @@ class ReportResponse(BaseModel):
     assigned_at: Optional[datetime]
     resolved_at: Optional[datetime]
     
+    @field_validator("image_urls", "thumbnail_urls", "image_hashes", mode="before")
+    @classmethod
+    def decode_json_list(cls, value):
+        # Stored as JSON arrays in Text columns
+        return json.loads(value) if isinstance(value, str) else value
+    
     class Config:
         from_attributes = True
 
 class ReportUpdate(BaseModel):
-    status: Optional[str] = Field(None, regex=r'^(submitted|verified|assigned|in_progress|resolved|closed)$')
+    status: Optional[str] = Field(None, pattern=r'^(submitted|verified|assigned|in_progress|resolved|closed)$')
     assigned_department_id: Optional[int] = None
     assigned_staff_id: Optional[UUID] = None
     comment: Optional[str] = None
@@ -81,8 +93,8 @@ class StatusUpdateResponse(BaseModel):
 class DepartmentCreate(BaseModel):
     name: str = Field(..., max_length=255)
     description: Optional[str] = None
-    contact_email: str = Field(..., regex=r'^[^@]+@[^@]+\.[^@]+$')
-    contact_phone: str = Field(..., regex=r'^\+?1?\d{9,15}$')
+    contact_email: str = Field(..., pattern=r'^[^@]+@[^@]+\.[^@]+$')
+    contact_phone: str = Field(..., pattern=r'^\+?1?\d{9,15}$')
 
 class DepartmentResponse(BaseModel):
     id: int
@@ -97,10 +109,10 @@ class DepartmentResponse(BaseModel):
 
 # Staff Schemas
 class StaffCreate(BaseModel):
-    email: str = Field(..., regex=r'^[^@]+@[^@]+\.[^@]+$')
+    email: str = Field(..., pattern=r'^[^@]+@[^@]+\.[^@]+$')
     name: str = Field(..., max_length=255)
     department_id: int
-    role: str = Field(..., regex=r'^(admin|supervisor|field_worker)$')
+    role: str = Field(..., pattern=r'^(admin|supervisor|field_worker)$')
 
 class StaffResponse(BaseModel):
     id: UUID
@@ -135,18 +147,36 @@ class AnalyticsResponse(BaseModel):
     hotspots: List[LocationHotspot]
     department_performance: dict
 
+# Ward Routing Schemas
+class WardLookupPoint(BaseModel):
+    latitude: float = Field(..., ge=-90, le=90)
+    longitude: float = Field(..., ge=-180, le=180)
+    category: Optional[str] = None
+
+class WardLookupRequest(BaseModel):
+    points: List[WardLookupPoint]
+
+class WardLookupResult(BaseModel):
+    ward_number: Optional[str]
+    department_id: Optional[int]
+
 # File Upload Schemas
 class FileUploadResponse(BaseModel):
     file_url: str
     ipfs_hash: Optional[str] = None
     file_size: int
     content_type: str
+    thumbnail_url: Optional[str] = None
+    inference_input_url: Optional[str] = None
+    perceptual_hash: Optional[str] = None
+    width: Optional[int] = None
+    height: Optional[int] = None
 
 # Notification Schemas
 class NotificationCreate(BaseModel):
     user_id: UUID
     message: str
-    type: str = Field(..., regex=r'^(sms|email|push)$')
+    type: str = Field(..., pattern=r'^(sms|email|push)$')
     
 class NotificationResponse(BaseModel):
     id: UUID
@@ -0,0 +1,141 @@
+import asyncio
+import heapq
+import itertools
+import logging
+from contextlib import asynccontextmanager
+from enum import IntEnum
+from typing import Dict, List, Optional, Tuple
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class Priority(IntEnum):
+    """Admission lanes; lower values are admitted first"""
+    HIGH = 0    # staff status updates, emergency-category reports
+    NORMAL = 1  # report submission, single-record reads, uploads
+    LOW = 2     # bulk listing, search and analytics
+
+
+class AdmissionRejected(Exception):
+    def __init__(self, route_class: str, retry_after: float):
+        super().__init__(f"Server busy: {route_class} requests are being shed")
+        self.route_class = route_class
+        self.retry_after = retry_after
+
+
+class _Lane:
+    """Counting semaphore whose waiters are woken in priority order"""
+
+    def __init__(self, name: str, capacity: int, max_queue: int, reserved: int = 0):
+        self.name = name
+        self.capacity = capacity
+        self.max_queue = max_queue
+        # Slots only HIGH priority requests may take
+        self.reserved = min(reserved, capacity - 1)
+        self.in_use = 0
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._counter = itertools.count()
+
+    def _limit(self, priority: Priority) -> int:
+        return self.capacity if priority == Priority.HIGH else self.capacity - self.reserved
+
+    def _can_enter(self, priority: Priority) -> bool:
+        if self.in_use >= self._limit(priority):
+            return False
+        # Do not overtake waiters of equal or higher priority
+        return not self._waiters or self._waiters[0][0] > priority
+
+    async def acquire(self, priority: Priority, timeout: float):
+        if self._can_enter(priority):
+            self.in_use += 1
+            return
+
+        if len(self._waiters) >= self.max_queue:
+            raise AdmissionRejected(self.name, timeout)
+
+        future = asyncio.get_running_loop().create_future()
+        entry = (int(priority), next(self._counter), future)
+        heapq.heappush(self._waiters, entry)
+        try:
+            await asyncio.wait_for(asyncio.shield(future), timeout)
+        except asyncio.TimeoutError:
+            if future.done() and not future.cancelled():
+                # The slot was handed over just as we gave up; pass it on
+                self.release()
+            self._remove(entry)
+            raise AdmissionRejected(self.name, timeout)
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.release()
+            self._remove(entry)
+            raise
+
+    def _remove(self, entry):
+        try:
+            self._waiters.remove(entry)
+            heapq.heapify(self._waiters)
+        except ValueError:
+            pass
+
+    def release(self):
+        self.in_use -= 1
+        while self._waiters:
+            priority, _, future = self._waiters[0]
+            if future.done():
+                heapq.heappop(self._waiters)
+                continue
+            if self.in_use >= self._limit(Priority(priority)):
+                break
+            heapq.heappop(self._waiters)
+            self.in_use += 1
+            future.set_result(None)
+
+
+class AdmissionController:
+    """Concurrency limits per route class plus a shared global limit.
+
+    A request first takes a slot in its route class, then one in the global
+    lane. Each lane queues waiters by priority, keeps a few global slots back
+    for HIGH priority work and sheds requests that cannot be admitted within
+    the queue timeout.
+    """
+
+    def __init__(
+        self,
+        limits: Optional[Dict[str, int]] = None,
+        max_concurrency: Optional[int] = None,
+        reserved_high: Optional[int] = None,
+        queue_timeout: Optional[float] = None
+    ):
+        limits = limits or settings.ADMISSION_LIMITS
+        max_concurrency = max_concurrency or settings.ADMISSION_MAX_CONCURRENCY
+        reserved_high = settings.ADMISSION_RESERVED_HIGH if reserved_high is None else reserved_high
+        self.queue_timeout = queue_timeout or settings.ADMISSION_QUEUE_TIMEOUT
+        max_queue = settings.ADMISSION_MAX_QUEUE
+
+        self.lanes = {name: _Lane(name, limit, max_queue) for name, limit in limits.items()}
+        self.global_lane = _Lane("global", max_concurrency, max_queue, reserved=reserved_high)
+
+    @asynccontextmanager
+    async def slot(self, route_class: str, priority: Priority = Priority.NORMAL):
+        """Hold a route-class and global slot for the duration of the block"""
+        lane = self.lanes[route_class]
+        await lane.acquire(priority, self.queue_timeout)
+        try:
+            await self.global_lane.acquire(priority, self.queue_timeout)
+        except BaseException:
+            lane.release()
+            raise
+        try:
+            yield
+        finally:
+            self.global_lane.release()
+            lane.release()
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        return {
+            lane.name: {"in_use": lane.in_use, "capacity": lane.capacity, "queued": len(lane._waiters)}
+            for lane in [*self.lanes.values(), self.global_lane]
+        }
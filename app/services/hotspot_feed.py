@@ -0,0 +1,148 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+from ..config import settings
+from ..database import SessionLocal, Report
+
+if TYPE_CHECKING:
+    import httpx
+
+logger = logging.getLogger(__name__)
+
+
+class HotspotFeed:
+    """Streams new reports to the ML hotspot grid and rebuilds it from the reports table.
+
+    Reports are buffered in process and posted to /api/hotspots/observe in
+    batches, so report submission never waits on the ML service. If the ML
+    service is down the buffer is capped and the oldest reports are dropped;
+    a bootstrap from the reports table recovers them.
+    """
+
+    MAX_PENDING = 10000
+
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        flush_interval: Optional[float] = None,
+        batch_size: Optional[int] = None,
+        session_factory=SessionLocal
+    ):
+        self.base_url = base_url or settings.ML_SERVICE_URL
+        self.flush_interval = flush_interval or settings.HOTSPOT_FEED_INTERVAL
+        self.batch_size = batch_size or settings.HOTSPOT_FEED_BATCH_SIZE
+        self.session_factory = session_factory
+        self._pending: List[Dict[str, Any]] = []
+        self._client: Optional["httpx.AsyncClient"] = None
+        self._stopping = asyncio.Event()
+
+    @staticmethod
+    def _payload(latitude: float, longitude: float, category: str, created_at: Optional[datetime]) -> Dict[str, Any]:
+        return {
+            "latitude": latitude,
+            "longitude": longitude,
+            "category": category,
+            "created_at": (created_at or datetime.utcnow()).isoformat()
+        }
+
+    def add(self, report: Report):
+        """Queue a newly created report; never blocks or raises"""
+        if report.latitude is None or report.longitude is None:
+            return
+        self._pending.append(self._payload(report.latitude, report.longitude, report.category, report.created_at))
+        if len(self._pending) > self.MAX_PENDING:
+            dropped = len(self._pending) - self.MAX_PENDING
+            del self._pending[:dropped]
+            logger.warning(f"Hotspot feed backlog full; dropped {dropped} oldest reports")
+
+    def _get_client(self) -> "httpx.AsyncClient":
+        if self._client is None:
+            import httpx
+            self._client = httpx.AsyncClient(base_url=self.base_url, timeout=30.0)
+        return self._client
+
+    async def _post(self, reports: List[Dict[str, Any]]) -> Dict[str, Any]:
+        response = await self._get_client().post("/api/hotspots/observe", json={"reports": reports})
+        response.raise_for_status()
+        return response.json()
+
+    async def _reset(self):
+        if not settings.HOTSPOT_RESET_TOKEN:
+            raise RuntimeError("HOTSPOT_RESET_TOKEN must be set to rebuild the hotspot grid")
+        response = await self._get_client().post(
+            "/api/hotspots/reset", headers={"X-Reset-Token": settings.HOTSPOT_RESET_TOKEN}
+        )
+        response.raise_for_status()
+
+    async def flush(self) -> int:
+        """Post queued reports; on failure they stay queued for the next attempt"""
+        sent = 0
+        while self._pending:
+            batch = self._pending[:self.batch_size]
+            del self._pending[:self.batch_size]
+            try:
+                result = await self._post(batch)
+            except Exception as e:
+                logger.warning(f"Hotspot feed to ML service failed, will retry: {str(e)}")
+                self._pending[:0] = batch
+                break
+            sent += result.get("ingested", 0)
+        return sent
+
+    async def run_forever(self):
+        """Flush on an interval until stop() is called"""
+        while not self._stopping.is_set():
+            try:
+                await asyncio.wait_for(self._stopping.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            await self.flush()
+        await self.close()
+
+    def stop(self):
+        self._stopping.set()
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def bootstrap(self, days: int = 56) -> int:
+        """Rebuild the ML grid from the last days of the reports table, oldest first"""
+        since = datetime.utcnow() - timedelta(days=days)
+        db = self.session_factory()
+        ingested = 0
+        try:
+            await self._reset()
+            query = (
+                db.query(Report.latitude, Report.longitude, Report.category, Report.created_at)
+                .filter(Report.created_at >= since)
+                .order_by(Report.created_at)
+                .yield_per(self.batch_size)
+            )
+            batch: List[Dict[str, Any]] = []
+            for row in query:
+                batch.append(self._payload(*row))
+                if len(batch) >= self.batch_size:
+                    ingested += (await self._post(batch))["ingested"]
+                    batch = []
+            if batch:
+                ingested += (await self._post(batch))["ingested"]
+        finally:
+            db.close()
+            await self.close()
+        logger.info(f"Hotspot grid rebuilt from {ingested} reports since {since.date()}")
+        return ingested
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Rebuild the ML hotspot grid from the reports table")
+    parser.add_argument("--days", type=int, default=56, help="History to replay; matches the grid window")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(HotspotFeed().bootstrap(args.days))
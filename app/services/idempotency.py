@@ -0,0 +1,228 @@
+import asyncio
+import json
+import logging
+import secrets
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from ..config import settings
+from .redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+# Only the holder of the lock token may release or extend the lock
+RELEASE_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+EXTEND_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('EXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+
+class IdempotencyConflict(Exception):
+    """The key was already used for a request with a different payload"""
+
+
+class IdempotencyInProgress(Exception):
+    """Another worker holds the key and did not finish within the wait budget"""
+
+
+class IdempotencyStore:
+    """Short-TTL store that coalesces and replays requests sharing an Idempotency-Key.
+
+    Completed responses live in Redis (falling back to process memory when Redis
+    is unavailable). Concurrent duplicates inside one process await the same
+    future; across processes a Redis lock is held while the first request runs
+    and the others poll for its stored result. If the first request is cancelled
+    or fails, a waiting duplicate takes over and runs its own handler.
+    """
+
+    POLL_INTERVAL = 0.1
+
+    def __init__(self, ttl_seconds: Optional[int] = None, lock_seconds: Optional[int] = None):
+        self.ttl_seconds = ttl_seconds or settings.IDEMPOTENCY_TTL_SECONDS
+        self.lock_seconds = lock_seconds or settings.IDEMPOTENCY_LOCK_SECONDS
+        self._local: Dict[str, Tuple[float, str]] = {}
+        self._inflight: Dict[str, Tuple[str, asyncio.Future]] = {}
+
+    # Storage primitives
+    async def _load(self, key: str) -> Optional[Dict[str, Any]]:
+        redis = await get_redis()
+        if redis is not None:
+            try:
+                raw = await redis.get(f"idempotency:{key}")
+                return json.loads(raw) if raw else None
+            except Exception as e:
+                logger.warning(f"Idempotency lookup failed, using local store: {str(e)}")
+
+        entry = self._local.get(key)
+        if entry is None:
+            return None
+        expires_at, raw = entry
+        if expires_at < time.monotonic():
+            del self._local[key]
+            return None
+        return json.loads(raw)
+
+    async def _save(self, key: str, record: Dict[str, Any]):
+        raw = json.dumps(record)
+        redis = await get_redis()
+        if redis is not None:
+            try:
+                await redis.set(f"idempotency:{key}", raw, ex=self.ttl_seconds)
+                return
+            except Exception as e:
+                logger.warning(f"Idempotency save failed, using local store: {str(e)}")
+        self._purge_local()
+        self._local[key] = (time.monotonic() + self.ttl_seconds, raw)
+
+    def _purge_local(self):
+        now = time.monotonic()
+        for key in [k for k, (expires_at, _) in self._local.items() if expires_at < now]:
+            del self._local[key]
+
+    async def _acquire_lock(self, key: str) -> Optional[str]:
+        """Return a lock token, or None when another worker holds the key"""
+        token = secrets.token_hex(16)
+        redis = await get_redis()
+        if redis is None:
+            return token
+        try:
+            acquired = await redis.set(f"idempotency-lock:{key}", token, nx=True, ex=self.lock_seconds)
+            return token if acquired else None
+        except Exception:
+            return token
+
+    async def _extend_lock(self, key: str, token: str):
+        """Keep the lock alive while a slow handler runs so retries keep waiting"""
+        while True:
+            await asyncio.sleep(self.lock_seconds / 3)
+            redis = await get_redis()
+            if redis is None:
+                continue
+            try:
+                await redis.eval(EXTEND_LOCK_SCRIPT, 1, f"idempotency-lock:{key}", token, self.lock_seconds)
+            except Exception as e:
+                logger.warning(f"Idempotency lock refresh failed: {str(e)}")
+
+    async def _release_lock(self, key: str, token: str):
+        redis = await get_redis()
+        if redis is not None:
+            try:
+                await redis.eval(RELEASE_LOCK_SCRIPT, 1, f"idempotency-lock:{key}", token)
+            except Exception:
+                pass
+
+    @staticmethod
+    def _replay(record: Dict[str, Any], fingerprint: str) -> Dict[str, Any]:
+        if record["fingerprint"] != fingerprint:
+            raise IdempotencyConflict("Idempotency-Key was reused with a different request payload")
+        return record["response"]
+
+    async def _lock_or_replay(self, key: str, fingerprint: str) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+        """Take the cross-process lock, or replay the result stored by the worker holding it.
+
+        Returns (token, None) once locked and (None, response) when the holder
+        finished first. A holder that fails releases the lock without storing a
+        result, so waiters keep trying to acquire it rather than only polling.
+        """
+        deadline = time.monotonic() + self.lock_seconds
+        while True:
+            token = await self._acquire_lock(key)
+            if token is not None:
+                # The previous holder may have stored its result before releasing
+                record = await self._load(key)
+                if record is None:
+                    return token, None
+                await self._release_lock(key, token)
+                return None, self._replay(record, fingerprint)
+            if time.monotonic() >= deadline:
+                raise IdempotencyInProgress("A request with this Idempotency-Key is still being processed")
+            await asyncio.sleep(self.POLL_INTERVAL)
+            record = await self._load(key)
+            if record is not None:
+                return None, self._replay(record, fingerprint)
+
+    async def run(
+        self,
+        key: str,
+        fingerprint: str,
+        handler: Callable[[], Awaitable[Dict[str, Any]]]
+    ) -> Dict[str, Any]:
+        """Return the stored response for key, or run handler exactly once and store its result"""
+        while True:
+            record = await self._load(key)
+            if record is not None:
+                return self._replay(record, fingerprint)
+
+            inflight = self._inflight.get(key)
+            if inflight is None:
+                return await self._run_owner(key, fingerprint, handler)
+
+            inflight_fingerprint, future = inflight
+            if inflight_fingerprint != fingerprint:
+                raise IdempotencyConflict("Idempotency-Key was reused with a different request payload")
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise  # this request was cancelled, not the one it was waiting on
+            except (IdempotencyConflict, IdempotencyInProgress):
+                raise
+            except Exception:
+                pass
+            # The owning request was cancelled or failed without storing a result;
+            # loop to re-check the store and take over as the owner
+            logger.info(f"Idempotent request {key} lost its owner, retrying as owner")
+
+    async def _run_owner(
+        self,
+        key: str,
+        fingerprint: str,
+        handler: Callable[[], Awaitable[Dict[str, Any]]]
+    ) -> Dict[str, Any]:
+        # Register before the next await so same-process duplicates coalesce onto this future
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = (fingerprint, future)
+        token = None
+        try:
+            token, response = await self._lock_or_replay(key, fingerprint)
+            if token is not None:
+                response = await self._run_locked(key, token, fingerprint, handler)
+            future.set_result(response)
+            return response
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            # Failed requests are not stored so the client may retry with the same key
+            future.set_exception(e)
+            # Mark retrieved so a failure nobody else awaited does not log a warning
+            future.exception()
+            raise
+        finally:
+            del self._inflight[key]
+            if token is not None:
+                await self._release_lock(key, token)
+
+    async def _run_locked(
+        self,
+        key: str,
+        token: str,
+        fingerprint: str,
+        handler: Callable[[], Awaitable[Dict[str, Any]]]
+    ) -> Dict[str, Any]:
+        refresher = asyncio.create_task(self._extend_lock(key, token))
+        try:
+            response = await handler()
+        finally:
+            refresher.cancel()
+        await self._save(key, {"fingerprint": fingerprint, "response": response})
+        return response
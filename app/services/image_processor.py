@@ -0,0 +1,126 @@
+import asyncio
+import io
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Optional
+
+from ..config import settings
+
+if TYPE_CHECKING:
+    from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+# dHash compares neighbouring pixels of a (HASH_SIZE + 1) x HASH_SIZE grayscale image
+HASH_SIZE = 8
+
+
+@dataclass
+class ProcessedImage:
+    """Artifacts produced from a single uploaded image"""
+    original: bytes          # re-encoded without EXIF / GPS metadata
+    original_format: str
+    thumbnail: bytes         # WebP, longest side <= THUMBNAIL_SIZE
+    model_input: bytes       # WebP, MODEL_INPUT_SIZE x MODEL_INPUT_SIZE RGB
+    perceptual_hash: str     # 64-bit dHash as 16 hex chars
+    width: int
+    height: int
+
+
+def perceptual_hash(image: "Image.Image") -> str:
+    """Compute a 64-bit difference hash of an image"""
+    import numpy as np
+    from PIL import Image
+
+    gray = image.convert("L").resize((HASH_SIZE + 1, HASH_SIZE), Image.LANCZOS)
+    pixels = np.asarray(gray, dtype=np.int16)
+    bits = (pixels[:, 1:] > pixels[:, :-1]).flatten()
+    value = int.from_bytes(np.packbits(bits).tobytes(), "big")
+    return f"{value:016x}"
+
+
+def hamming_distance(hash_a: str, hash_b: str) -> int:
+    """Number of differing bits between two perceptual hashes"""
+    return bin(int(hash_a, 16) ^ int(hash_b, 16)).count("1")
+
+
+def _encode_webp(image: "Image.Image", quality: int) -> bytes:
+    buffer = io.BytesIO()
+    image.save(buffer, format="WEBP", quality=quality, method=4)
+    return buffer.getvalue()
+
+
+def _process_image(data: bytes, thumbnail_size: int, model_input_size: int, quality: int) -> ProcessedImage:
+    """CPU-bound part of the pipeline; runs inside a worker process"""
+    # Pillow is imported here so the API process only loads it in its pool workers
+    from PIL import Image, ImageOps
+
+    with Image.open(io.BytesIO(data)) as source:
+        source_format = source.format or "JPEG"
+        # Bake the EXIF orientation into the pixels before the metadata is dropped
+        image = ImageOps.exif_transpose(source)
+        if image.mode not in ("RGB", "RGBA", "L"):
+            image = image.convert("RGB")
+
+    # Copy only pixel data so EXIF, GPS and maker notes never leave this function
+    clean = Image.new(image.mode, image.size)
+    clean.paste(image)
+
+    original = io.BytesIO()
+    if source_format.upper() in ("JPEG", "JPG", "MPO"):
+        clean.convert("RGB").save(original, format="JPEG", quality=90, optimize=True)
+        source_format = "JPEG"
+    elif source_format.upper() == "PNG":
+        clean.save(original, format="PNG", optimize=True)
+    else:
+        clean.save(original, format="WEBP", quality=quality)
+        source_format = "WEBP"
+
+    rgb = clean.convert("RGB")
+
+    thumbnail = rgb.copy()
+    thumbnail.thumbnail((thumbnail_size, thumbnail_size), Image.LANCZOS)
+
+    # Letterbox to a square so the classifier never has to resize or distort
+    model_input = ImageOps.pad(rgb, (model_input_size, model_input_size), method=Image.BILINEAR, color=(0, 0, 0))
+
+    return ProcessedImage(
+        original=original.getvalue(),
+        original_format=source_format,
+        thumbnail=_encode_webp(thumbnail, quality),
+        model_input=_encode_webp(model_input, quality),
+        perceptual_hash=perceptual_hash(rgb),
+        width=rgb.width,
+        height=rgb.height,
+    )
+
+
+class ImageProcessor:
+    """Upload-time image pipeline backed by a process pool"""
+
+    def __init__(self, max_workers: Optional[int] = None):
+        self.max_workers = max_workers or settings.IMAGE_WORKERS
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._executor
+
+    async def process(self, data: bytes) -> ProcessedImage:
+        """Strip metadata, build thumbnail/model variants and hash an image"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._get_executor(),
+            _process_image,
+            data,
+            settings.THUMBNAIL_SIZE,
+            settings.MODEL_INPUT_SIZE,
+            settings.WEBP_QUALITY,
+        )
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
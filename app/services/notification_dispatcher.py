@@ -0,0 +1,339 @@
+import asyncio
+import logging
+import smtplib
+import time
+import uuid
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from email.message import EmailMessage
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+from sqlalchemy import or_
+
+from ..config import settings
+from ..database import SessionLocal, NotificationOutbox
+
+if TYPE_CHECKING:
+    import httpx
+
+logger = logging.getLogger(__name__)
+
+# Result of one send attempt: (outbox id, error message or None on success)
+SendResult = Tuple[str, Optional[str]]
+
+
+@dataclass
+class Notification:
+    """Detached copy of an outbox row handed to a sender"""
+    id: str
+    channel: str
+    recipient: str
+    subject: Optional[str]
+    message: str
+    attempts: int
+
+
+@dataclass
+class DispatcherMetrics:
+    started_at: float = field(default_factory=time.monotonic)
+    batches: int = 0
+    sent: int = 0
+    failed: int = 0
+    retried: int = 0
+    deduplicated: int = 0
+    send_seconds: float = 0.0
+    by_channel: Dict[str, int] = field(default_factory=lambda: defaultdict(int))
+
+    def snapshot(self) -> dict:
+        uptime = max(time.monotonic() - self.started_at, 1e-9)
+        return {
+            "uptime_seconds": round(uptime, 1),
+            "batches": self.batches,
+            "sent": self.sent,
+            "failed": self.failed,
+            "retried": self.retried,
+            "deduplicated": self.deduplicated,
+            "sent_by_channel": dict(self.by_channel),
+            "throughput_per_second": round(self.sent / uptime, 2),
+            "send_throughput_per_second": round(self.sent / self.send_seconds, 2) if self.send_seconds else 0.0,
+        }
+
+
+class EmailSender:
+    """Sends a batch of emails over one SMTP connection that is kept open between batches"""
+
+    def __init__(self):
+        self._connection: Optional[smtplib.SMTP] = None
+
+    def _connect(self) -> smtplib.SMTP:
+        connection = smtplib.SMTP(settings.SMTP_SERVER, settings.SMTP_PORT, timeout=30)
+        if settings.SMTP_USE_TLS:
+            connection.starttls()
+        if settings.EMAIL_USERNAME and settings.EMAIL_PASSWORD:
+            connection.login(settings.EMAIL_USERNAME, settings.EMAIL_PASSWORD)
+        return connection
+
+    def _get_connection(self) -> smtplib.SMTP:
+        if self._connection is not None:
+            try:
+                self._connection.noop()
+                return self._connection
+            except smtplib.SMTPException:
+                self.close()
+        self._connection = self._connect()
+        return self._connection
+
+    def _send_batch_sync(self, notifications: List[Notification]) -> List[SendResult]:
+        results = []
+        try:
+            connection = self._get_connection()
+        except (OSError, smtplib.SMTPException) as e:
+            return [(n.id, f"SMTP connect failed: {str(e)}") for n in notifications]
+
+        for notification in notifications:
+            email = EmailMessage()
+            email["From"] = settings.EMAIL_FROM or settings.EMAIL_USERNAME
+            email["To"] = notification.recipient
+            email["Subject"] = notification.subject or "Civic report update"
+            email.set_content(notification.message)
+            try:
+                connection.send_message(email)
+                results.append((notification.id, None))
+            except smtplib.SMTPServerDisconnected as e:
+                # Reconnect once and retry this message; later ones use the new connection
+                self.close()
+                try:
+                    connection = self._get_connection()
+                    connection.send_message(email)
+                    results.append((notification.id, None))
+                except (OSError, smtplib.SMTPException) as retry_error:
+                    results.append((notification.id, str(retry_error)))
+            except (OSError, smtplib.SMTPException) as e:
+                results.append((notification.id, str(e)))
+        return results
+
+    async def send_batch(self, notifications: List[Notification]) -> List[SendResult]:
+        return await asyncio.to_thread(self._send_batch_sync, notifications)
+
+    def close(self):
+        if self._connection is not None:
+            try:
+                self._connection.quit()
+            except Exception:
+                pass
+            self._connection = None
+
+
+class SmsSender:
+    """Sends SMS through the Twilio REST API over a pooled HTTP client"""
+
+    def __init__(self, concurrency: Optional[int] = None):
+        self.concurrency = concurrency or settings.NOTIFICATION_SMS_CONCURRENCY
+        self._client: Optional["httpx.AsyncClient"] = None
+
+    def _get_client(self) -> "httpx.AsyncClient":
+        if self._client is None:
+            import httpx
+            self._client = httpx.AsyncClient(
+                base_url=settings.TWILIO_API_URL,
+                auth=(settings.TWILIO_ACCOUNT_SID or "", settings.TWILIO_AUTH_TOKEN or ""),
+                limits=httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency),
+                timeout=15.0
+            )
+        return self._client
+
+    async def _send(self, client: "httpx.AsyncClient", semaphore: asyncio.Semaphore, notification: Notification) -> SendResult:
+        import httpx
+
+        async with semaphore:
+            try:
+                response = await client.post(
+                    f"/2010-04-01/Accounts/{settings.TWILIO_ACCOUNT_SID}/Messages.json",
+                    data={"To": notification.recipient, "From": settings.TWILIO_FROM_NUMBER, "Body": notification.message}
+                )
+                if response.status_code >= 400:
+                    return notification.id, f"HTTP {response.status_code}: {response.text[:200]}"
+                return notification.id, None
+            except httpx.HTTPError as e:
+                return notification.id, str(e)
+
+    async def send_batch(self, notifications: List[Notification]) -> List[SendResult]:
+        client = self._get_client()
+        semaphore = asyncio.Semaphore(self.concurrency)
+        return await asyncio.gather(*(self._send(client, semaphore, n) for n in notifications))
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+class NotificationDispatcher:
+    """Drains the notification outbox in per-channel batches with retry and dedup.
+
+    Rows are claimed with SELECT ... FOR UPDATE SKIP LOCKED and leased by
+    moving next_attempt_at forward, so several workers can run side by side
+    and a crashed worker's rows become claimable again when the lease expires.
+    """
+
+    LEASE_SECONDS = 120
+    BACKOFF_BASE_SECONDS = 30
+    BACKOFF_MAX_SECONDS = 3600
+
+    def __init__(
+        self,
+        session_factory=SessionLocal,
+        email_sender: Optional[EmailSender] = None,
+        sms_sender: Optional[SmsSender] = None,
+        batch_size: Optional[int] = None,
+        poll_interval: Optional[float] = None,
+        max_attempts: Optional[int] = None
+    ):
+        self.session_factory = session_factory
+        self.senders = {
+            "email": email_sender or EmailSender(),
+            "sms": sms_sender or SmsSender(),
+        }
+        self.batch_size = batch_size or settings.NOTIFICATION_BATCH_SIZE
+        self.poll_interval = poll_interval or settings.NOTIFICATION_POLL_INTERVAL
+        self.max_attempts = max_attempts or settings.NOTIFICATION_MAX_ATTEMPTS
+        self.metrics = DispatcherMetrics()
+        self._stopping = asyncio.Event()
+
+    def _claim_batch(self) -> List[Notification]:
+        now = datetime.utcnow()
+        db = self.session_factory()
+        try:
+            rows = (
+                db.query(NotificationOutbox)
+                .filter(
+                    or_(NotificationOutbox.status == "pending", NotificationOutbox.status == "sending"),
+                    NotificationOutbox.next_attempt_at <= now
+                )
+                .order_by(NotificationOutbox.next_attempt_at)
+                .limit(self.batch_size)
+                .with_for_update(skip_locked=True)
+                .all()
+            )
+            claimed = []
+            for row in rows:
+                row.status = "sending"
+                row.attempts = (row.attempts or 0) + 1
+                row.next_attempt_at = now + timedelta(seconds=self.LEASE_SECONDS)
+                claimed.append(Notification(
+                    id=str(row.id), channel=row.channel, recipient=row.recipient,
+                    subject=row.subject, message=row.message, attempts=row.attempts
+                ))
+            db.commit()
+            return claimed
+        finally:
+            db.close()
+
+    def _record_results(self, notifications: Dict[str, Notification], results: Dict[str, Optional[str]]):
+        now = datetime.utcnow()
+        db = self.session_factory()
+        try:
+            rows = db.query(NotificationOutbox).filter(NotificationOutbox.id.in_([uuid.UUID(i) for i in results])).all()
+            for row in rows:
+                error = results[str(row.id)]
+                if error is None:
+                    row.status = "sent"
+                    row.sent_at = now
+                    row.last_error = None
+                elif notifications[str(row.id)].attempts >= self.max_attempts:
+                    row.status = "failed"
+                    row.last_error = error
+                else:
+                    backoff = min(self.BACKOFF_BASE_SECONDS * 2 ** (row.attempts - 1), self.BACKOFF_MAX_SECONDS)
+                    row.status = "pending"
+                    row.next_attempt_at = now + timedelta(seconds=backoff)
+                    row.last_error = error
+            db.commit()
+        finally:
+            db.close()
+
+    async def dispatch_once(self) -> int:
+        """Claim and send one batch; returns the number of outbox rows processed"""
+        claimed = await asyncio.to_thread(self._claim_batch)
+        if not claimed:
+            return 0
+
+        # Collapse identical messages to the same recipient into a single send
+        unique: Dict[Tuple[str, str, str], Notification] = {}
+        duplicates: Dict[str, List[str]] = defaultdict(list)
+        for notification in claimed:
+            key = (notification.channel, notification.recipient, notification.message)
+            if key in unique:
+                duplicates[unique[key].id].append(notification.id)
+                self.metrics.deduplicated += 1
+            else:
+                unique[key] = notification
+
+        by_channel: Dict[str, List[Notification]] = defaultdict(list)
+        for notification in unique.values():
+            by_channel[notification.channel].append(notification)
+
+        started = time.monotonic()
+        results: Dict[str, Optional[str]] = {}
+        channel_results = await asyncio.gather(*(
+            self.senders[channel].send_batch(batch) if channel in self.senders
+            else self._unsupported(batch)
+            for channel, batch in by_channel.items()
+        ))
+        self.metrics.send_seconds += time.monotonic() - started
+
+        for channel, batch_results in zip(by_channel, channel_results):
+            for notification_id, error in batch_results:
+                for outbox_id in [notification_id, *duplicates[notification_id]]:
+                    results[outbox_id] = error
+                if error is None:
+                    self.metrics.sent += 1
+                    self.metrics.by_channel[channel] += 1
+                else:
+                    logger.warning(f"{channel} notification {notification_id} failed: {error}")
+
+        notifications = {n.id: n for n in claimed}
+        for outbox_id, error in results.items():
+            if error is not None:
+                if notifications[outbox_id].attempts >= self.max_attempts:
+                    self.metrics.failed += 1
+                else:
+                    self.metrics.retried += 1
+
+        await asyncio.to_thread(self._record_results, notifications, results)
+        self.metrics.batches += 1
+        return len(claimed)
+
+    @staticmethod
+    async def _unsupported(batch: List[Notification]) -> List[SendResult]:
+        return [(n.id, f"Unsupported channel: {n.channel}") for n in batch]
+
+    async def run_forever(self):
+        """Poll the outbox until stop() is called; full batches are drained without sleeping"""
+        logger.info("Notification dispatcher started")
+        while not self._stopping.is_set():
+            try:
+                processed = await self.dispatch_once()
+            except Exception as e:
+                logger.error(f"Notification dispatch failed: {str(e)}")
+                processed = 0
+            if processed < self.batch_size:
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+        await self.close()
+        logger.info(f"Notification dispatcher stopped: {self.metrics.snapshot()}")
+
+    def stop(self):
+        self._stopping.set()
+
+    async def close(self):
+        self.senders["email"].close()
+        await self.senders["sms"].close()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(NotificationDispatcher().run_forever())
@@ -0,0 +1,118 @@
+import logging
+import uuid
+from datetime import datetime, timedelta
+from typing import List, Set
+
+from sqlalchemy import event, func
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from ..database import SessionLocal, NotificationOutbox, Report, StatusUpdate
+
+logger = logging.getLogger(__name__)
+
+STATUS_MESSAGES = {
+    "verified": "has been verified",
+    "assigned": "has been assigned to a department",
+    "in_progress": "is being worked on",
+    "resolved": "has been resolved",
+    "closed": "has been closed",
+}
+
+
+def configured_channels() -> Set[str]:
+    """Channels with delivery credentials; rows for any other channel could only ever fail"""
+    channels = set()
+    if settings.TWILIO_ACCOUNT_SID and settings.TWILIO_AUTH_TOKEN and settings.TWILIO_FROM_NUMBER:
+        channels.add("sms")
+    if settings.SMTP_SERVER and (settings.EMAIL_FROM or settings.EMAIL_USERNAME):
+        channels.add("email")
+    return channels
+
+
+def build_status_notifications(report: Report, status_update: StatusUpdate) -> List[NotificationOutbox]:
+    """Outbox rows telling the reporter about a status change"""
+    reporter = report.reporter
+    if reporter is None:
+        return []
+
+    headline = STATUS_MESSAGES.get(status_update.new_status, f"is now {status_update.new_status}")
+    message = f"Your report \"{report.title}\" {headline}."
+    if status_update.comment:
+        message += f" Note: {status_update.comment}"
+
+    channels = configured_channels()
+    rows = []
+    if "sms" in channels and reporter.phone_number:
+        rows.append(NotificationOutbox(
+            channel="sms",
+            recipient=reporter.phone_number,
+            message=message,
+            dedup_key=f"status:{status_update.id}:sms"
+        ))
+    if "email" in channels and reporter.email:
+        rows.append(NotificationOutbox(
+            channel="email",
+            recipient=reporter.email,
+            subject=f"Update on your civic report: {status_update.new_status.replace('_', ' ')}",
+            message=message,
+            dedup_key=f"status:{status_update.id}:email"
+        ))
+    return rows
+
+
+def _queue_status_notifications(session: Session, flush_context, instances):
+    """Write outbox rows in the same flush, and so the same transaction, as each StatusUpdate"""
+    status_updates = [obj for obj in session.new if isinstance(obj, StatusUpdate)]
+    if not status_updates:
+        return
+
+    with session.no_autoflush:
+        for status_update in status_updates:
+            if status_update.old_status == status_update.new_status:
+                continue
+            if status_update.id is None:
+                # Column defaults only apply at insert time; the dedup key needs the id now
+                status_update.id = uuid.uuid4()
+            report = status_update.report or session.get(Report, status_update.report_id)
+            if report is None:
+                continue
+            session.add_all(build_status_notifications(report, status_update))
+
+
+def install_outbox_listener(session_factory=SessionLocal):
+    """Queue notifications whenever a session created by session_factory flushes a StatusUpdate"""
+    if not event.contains(session_factory, "before_flush", _queue_status_notifications):
+        event.listen(session_factory, "before_flush", _queue_status_notifications)
+
+
+def outbox_stats(db: Session, window_seconds: int = 300) -> dict:
+    """Delivery state read from the outbox itself, so it covers every dispatcher process"""
+    now = datetime.utcnow()
+    by_channel: dict = {}
+    for channel, status, count in (
+        db.query(NotificationOutbox.channel, NotificationOutbox.status, func.count())
+        .group_by(NotificationOutbox.channel, NotificationOutbox.status)
+        .all()
+    ):
+        by_channel.setdefault(channel, {})[status] = count
+
+    sent_recently = (
+        db.query(func.count())
+        .select_from(NotificationOutbox)
+        .filter(NotificationOutbox.sent_at >= now - timedelta(seconds=window_seconds))
+        .scalar()
+    )
+    oldest_pending = (
+        db.query(func.min(NotificationOutbox.created_at))
+        .filter(NotificationOutbox.status.in_(["pending", "sending"]))
+        .scalar()
+    )
+    return {
+        "by_channel": by_channel,
+        "pending": sum(c.get("pending", 0) + c.get("sending", 0) for c in by_channel.values()),
+        "failed": sum(c.get("failed", 0) for c in by_channel.values()),
+        f"sent_last_{window_seconds}s": sent_recently,
+        "throughput_per_second": round(sent_recently / window_seconds, 2),
+        "oldest_pending_seconds": round((now - oldest_pending).total_seconds(), 1) if oldest_pending else 0.0,
+    }
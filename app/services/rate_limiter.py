@@ -0,0 +1,91 @@
+import logging
+import math
+import time
+from typing import Dict, List, Optional, Tuple
+
+from ..config import settings
+from .redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+# Refill and take from a bucket atomically; returns {allowed, seconds until enough tokens}
+TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local cost = tonumber(ARGV[4])
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1]) or capacity
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+local retry_after = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+else
+    retry_after = (cost - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return {allowed, tostring(retry_after)}
+"""
+
+
+class RateLimiter:
+    """Token-bucket rate limiter keyed by user or client IP.
+
+    Buckets live in Redis so every API worker shares the same budget; if Redis
+    is unreachable each process enforces the limit on its own.
+    """
+
+    MAX_LOCAL_BUCKETS = 100_000
+
+    def __init__(self, rate_per_minute: Optional[int] = None, burst: Optional[int] = None):
+        self.rate = (rate_per_minute or settings.RATE_LIMIT_PER_MINUTE) / 60.0
+        self.capacity = burst or settings.RATE_LIMIT_BURST
+        self._script = None
+        self._local: Dict[str, List[float]] = {}
+
+    async def acquire(self, key: str, cost: float = 1.0) -> Tuple[bool, float]:
+        """Take cost tokens from key's bucket; returns (allowed, retry_after_seconds)"""
+        now = time.time()
+        redis = await get_redis()
+        if redis is not None:
+            try:
+                if self._script is None:
+                    self._script = redis.register_script(TOKEN_BUCKET_SCRIPT)
+                allowed, retry_after = await self._script(
+                    keys=[f"ratelimit:{key}"], args=[self.rate, self.capacity, now, cost]
+                )
+                return bool(int(allowed)), float(retry_after)
+            except Exception as e:
+                logger.warning(f"Redis rate limit failed, using local bucket: {str(e)}")
+        return self._acquire_local(key, now, cost)
+
+    def _acquire_local(self, key: str, now: float, cost: float) -> Tuple[bool, float]:
+        bucket = self._local.get(key)
+        if bucket is None:
+            if len(self._local) >= self.MAX_LOCAL_BUCKETS:
+                self._evict_full_buckets(now)
+            bucket = self._local[key] = [float(self.capacity), now]
+
+        tokens = min(self.capacity, bucket[0] + max(0.0, now - bucket[1]) * self.rate)
+        bucket[1] = now
+        if tokens >= cost:
+            bucket[0] = tokens - cost
+            return True, 0.0
+        bucket[0] = tokens
+        return False, (cost - tokens) / self.rate
+
+    def _evict_full_buckets(self, now: float):
+        # A bucket that has refilled completely carries no state worth keeping
+        refill_seconds = self.capacity / self.rate
+        for key in [k for k, (_, ts) in self._local.items() if now - ts >= refill_seconds]:
+            del self._local[key]
+        if len(self._local) >= self.MAX_LOCAL_BUCKETS:
+            self._local.clear()
+
+
+def retry_after_header(seconds: float) -> Dict[str, str]:
+    return {"Retry-After": str(max(1, math.ceil(seconds)))}
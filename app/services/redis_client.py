@@ -0,0 +1,47 @@
+import asyncio
+import logging
+import time
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+RETRY_INITIAL_SECONDS = 1.0
+RETRY_MAX_SECONDS = 30.0
+
+_client = None
+_init_lock = asyncio.Lock()
+_next_attempt = 0.0
+_retry_delay = RETRY_INITIAL_SECONDS
+
+
+async def get_redis():
+    """Return a shared async Redis client, or None while Redis is unreachable.
+
+    Failed connection attempts are retried with exponential backoff, so a
+    worker only uses its in-process fallbacks for as long as Redis is down.
+    """
+    global _client, _next_attempt, _retry_delay
+    if _client is not None:
+        return _client
+    if time.monotonic() < _next_attempt:
+        return None
+
+    async with _init_lock:
+        # Concurrent first callers wait here for the one connection attempt
+        if _client is not None or time.monotonic() < _next_attempt:
+            return _client
+        try:
+            import redis.asyncio as aioredis
+            client = aioredis.from_url(settings.REDIS_URL, decode_responses=True)
+            await client.ping()
+            _client = client
+            _retry_delay = RETRY_INITIAL_SECONDS
+            logger.info("Connected to Redis")
+        except Exception as e:
+            logger.warning(
+                f"Redis unavailable, using in-process state; retrying in {_retry_delay:.0f}s: {str(e)}"
+            )
+            _next_attempt = time.monotonic() + _retry_delay
+            _retry_delay = min(_retry_delay * 2, RETRY_MAX_SECONDS)
+    return _client
@@ -0,0 +1,184 @@
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence
+
+from ..config import settings
+
+if TYPE_CHECKING:
+    import numpy as np
+    from shapely.strtree import STRtree
+
+logger = logging.getLogger(__name__)
+
+
+class WardBoundaryError(Exception):
+    """The boundaries file could not be parsed into ward polygons"""
+
+
+@dataclass(frozen=True)
+class WardMatch:
+    ward_number: str
+    department_id: Optional[int]
+
+
+@dataclass(frozen=True)
+class _Snapshot:
+    """Immutable index state; swapped as a whole on reload so lookups never lock"""
+    tree: "STRtree"
+    areas: "np.ndarray"
+    wards: List[str]
+    default_departments: List[Optional[int]]
+    category_departments: List[Dict[str, int]]
+    mtime: float
+
+
+class WardIndex:
+    """Point-in-polygon index mapping coordinates to wards and departments.
+
+    Boundaries are read from a GeoJSON FeatureCollection whose features carry
+    ``ward_number``, an optional ``department_id`` and an optional
+    ``departments`` mapping of report category to department id. Where wards
+    overlap, the smallest polygon wins. A changed file is rebuilt on a
+    background thread while lookups keep using the previous snapshot.
+    """
+
+    def __init__(self, path: Optional[str] = None, reload_interval: Optional[float] = None):
+        self.path = path or settings.WARD_BOUNDARIES_PATH
+        self.reload_interval = settings.WARD_RELOAD_INTERVAL if reload_interval is None else reload_interval
+        self._snapshot: Optional[_Snapshot] = None
+        self._last_check = 0.0
+        self._failed_mtime: Optional[float] = None
+        self._reload_lock = threading.Lock()
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._snapshot is not None
+
+    @property
+    def size(self) -> int:
+        return len(self._snapshot.wards) if self._snapshot else 0
+
+    def _build(self) -> _Snapshot:
+        # Geometry libraries are only imported once boundaries actually exist
+        import shapely
+        from shapely.geometry import shape
+        from shapely.strtree import STRtree
+
+        mtime = os.path.getmtime(self.path)
+        try:
+            with open(self.path) as f:
+                features = json.load(f)["features"]
+            geometries = [shape(feature["geometry"]) for feature in features]
+            properties = [feature.get("properties") or {} for feature in features]
+            wards = [str(p["ward_number"]) for p in properties]
+        except (ValueError, KeyError, TypeError, AttributeError, shapely.errors.ShapelyError) as e:
+            raise WardBoundaryError(f"Invalid ward boundaries in {self.path}: {str(e)}") from e
+
+        shapely.prepare(geometries)
+        return _Snapshot(
+            tree=STRtree(geometries),
+            areas=shapely.area(geometries),
+            wards=wards,
+            default_departments=[p.get("department_id") for p in properties],
+            category_departments=[p.get("departments") or {} for p in properties],
+            mtime=mtime
+        )
+
+    def load(self) -> bool:
+        """(Re)build the index from the boundaries file; returns False if there is none.
+
+        Blocks while parsing; call it from a thread when on the event loop.
+        Raises WardBoundaryError for a malformed file and keeps the old index.
+        """
+        if not self.path or not os.path.exists(self.path):
+            logger.warning(f"Ward boundaries not found at {self.path}; ward routing disabled")
+            return False
+
+        with self._reload_lock:
+            snapshot = self._build()
+            self._snapshot = snapshot
+            self._last_check = time.monotonic()
+
+        logger.info(f"Ward index loaded with {len(snapshot.wards)} boundaries")
+        return True
+
+    def _reload_in_background(self, mtime: float):
+        try:
+            self.load()
+        except Exception as e:
+            # Keep serving the previous boundaries and don't retry until the file changes again
+            self._failed_mtime = mtime
+            logger.error(f"Ward boundary reload failed: {str(e)}")
+
+    def maybe_reload(self):
+        """Start a background rebuild when the boundaries file changed; checked at most once per interval"""
+        now = time.monotonic()
+        if not self.path or now - self._last_check < self.reload_interval:
+            return
+        self._last_check = now
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            return
+        changed = self._snapshot is None or mtime != self._snapshot.mtime
+        if changed and mtime != self._failed_mtime and not self._reload_lock.locked():
+            threading.Thread(
+                target=self._reload_in_background, args=(mtime,), name="ward-index-reload", daemon=True
+            ).start()
+
+    def _match(self, snapshot: _Snapshot, index: int, category: Optional[str]) -> WardMatch:
+        department_id = snapshot.category_departments[index].get(category) if category else None
+        if department_id is None:
+            department_id = snapshot.default_departments[index]
+        return WardMatch(ward_number=snapshot.wards[index], department_id=department_id)
+
+    def lookup(self, latitude: float, longitude: float, category: Optional[str] = None) -> Optional[WardMatch]:
+        """Ward and responsible department for a single point"""
+        self.maybe_reload()
+        snapshot = self._snapshot
+        if snapshot is None:
+            return None
+
+        import numpy as np
+        import shapely
+
+        candidates = snapshot.tree.query(shapely.Point(longitude, latitude), predicate="intersects")
+        if candidates.size == 0:
+            return None
+        best = candidates[np.argmin(snapshot.areas[candidates])] if candidates.size > 1 else candidates[0]
+        return self._match(snapshot, int(best), category)
+
+    def lookup_many(
+        self,
+        latitudes: Sequence[float],
+        longitudes: Sequence[float],
+        categories: Optional[Sequence[Optional[str]]] = None
+    ) -> List[Optional[WardMatch]]:
+        """Vectorised lookup for bulk imports"""
+        self.maybe_reload()
+        snapshot = self._snapshot
+        results: List[Optional[WardMatch]] = [None] * len(latitudes)
+        if snapshot is None or not results:
+            return results
+
+        import numpy as np
+        import shapely
+
+        points = shapely.points(np.asarray(longitudes, dtype=float), np.asarray(latitudes, dtype=float))
+        point_idx, ward_idx = snapshot.tree.query(points, predicate="intersects")
+        if point_idx.size == 0:
+            return results
+
+        # Order by point then polygon area so the first hit per point is the smallest ward
+        order = np.lexsort((snapshot.areas[ward_idx], point_idx))
+        point_idx, ward_idx = point_idx[order], ward_idx[order]
+        first = np.r_[True, point_idx[1:] != point_idx[:-1]]
+
+        for point, ward in zip(point_idx[first], ward_idx[first]):
+            category = categories[point] if categories is not None else None
+            results[int(point)] = self._match(snapshot, int(ward), category)
+        return results
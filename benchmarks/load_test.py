@@ -0,0 +1,241 @@
+"""httpx-driven load scenarios for the core API and the ML services.
+
+Each virtual user repeatedly picks a weighted scenario, issues the request
+and records its latency. Report ids for read/update scenarios are sampled
+from a synthetic city generated by benchmarks.synthetic_city and loaded into
+the API's database.
+
+Every virtual user sends its own X-User-Id. The API only uses that header for
+rate limiting when the request comes from a trusted proxy, so start it with
+the load generator's address trusted (or with a higher per-minute limit);
+otherwise all users share one client-IP bucket and mostly measure the limiter:
+
+    RATE_LIMIT_TRUSTED_PROXIES='["127.0.0.1"]' uvicorn app.main:app
+    python -m benchmarks.load_test --users 50 --duration 60 --data bench_data --output load.json
+
+429 responses are counted per scenario as ``rate_limited``, separately from errors.
+"""
+import argparse
+import asyncio
+import csv
+import itertools
+import json
+import os
+import random
+import time
+import uuid
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+import httpx
+
+from .stats import summarize, write_results
+
+CATEGORIES = ["pothole", "garbage", "streetlight", "water", "road", "other"]
+STATUSES = ["verified", "assigned", "in_progress", "resolved"]
+
+
+@dataclass
+class Scenario:
+    name: str
+    service: str  # "api" or "ml"
+    weight: int
+    build: Callable[["ScenarioContext"], dict]
+
+
+class ScenarioContext:
+    """Sample data shared by all virtual users"""
+
+    def __init__(self, data_dir: Optional[str], sample_size: int = 10_000, seed: int = 1):
+        self.rng = random.Random(seed)
+        self.report_ids: List[str] = []
+        self.staff_ids: List[str] = []
+        self.points = [(28.6139 + self.rng.uniform(-0.2, 0.2), 77.2090 + self.rng.uniform(-0.2, 0.2))
+                       for _ in range(sample_size)]
+        if data_dir:
+            self.report_ids = self._sample_column(os.path.join(data_dir, "reports.csv"), "id", sample_size)
+            self.staff_ids = self._sample_column(os.path.join(data_dir, "staff.csv"), "id", sample_size)
+
+    @staticmethod
+    def _sample_column(path: str, column: str, limit: int) -> List[str]:
+        if not os.path.exists(path):
+            return []
+        with open(path) as f:
+            return [row[column] for row in itertools.islice(csv.DictReader(f), limit)]
+
+    def point(self):
+        return self.rng.choice(self.points)
+
+    def report_id(self) -> str:
+        return self.rng.choice(self.report_ids) if self.report_ids else str(uuid.uuid4())
+
+
+def _create_report(ctx: ScenarioContext) -> dict:
+    lat, lon = ctx.point()
+    category = ctx.rng.choice(CATEGORIES)
+    return {
+        "method": "POST", "url": "/api/reports",
+        "headers": {"Idempotency-Key": str(uuid.uuid4())},
+        "data": {
+            "title": f"Load test {category}", "description": "Synthetic report from the load suite",
+            "category": category, "latitude": lat, "longitude": lon,
+        },
+    }
+
+
+def _update_report(ctx: ScenarioContext) -> dict:
+    params = {"staff_id": ctx.rng.choice(ctx.staff_ids)} if ctx.staff_ids else {}
+    return {
+        "method": "PUT", "url": f"/api/reports/{ctx.report_id()}", "params": params,
+        "json": {"status": ctx.rng.choice(STATUSES), "comment": "Load test update"},
+    }
+
+
+def _ward_lookup(ctx: ScenarioContext) -> dict:
+    points = [{"latitude": lat, "longitude": lon, "category": ctx.rng.choice(CATEGORIES)}
+              for lat, lon in (ctx.point() for _ in range(100))]
+    return {"method": "POST", "url": "/api/wards/lookup", "json": {"points": points}}
+
+
+def _search(ctx: ScenarioContext) -> dict:
+    lat, lon = ctx.point()
+    return {"method": "GET", "url": "/api/search/reports",
+            "params": {"q": ctx.rng.choice(CATEGORIES), "latitude": lat, "longitude": lon, "radius_km": 2}}
+
+
+def _predict_hotspots(ctx: ScenarioContext) -> dict:
+    lat, lon = ctx.point()
+    return {"method": "POST", "url": "/api/predict/hotspots",
+            "json": {"min_lat": lat - 0.05, "min_lon": lon - 0.05, "max_lat": lat + 0.05,
+                     "max_lon": lon + 0.05, "horizon_days": 7}}
+
+
+def _observe(ctx: ScenarioContext) -> dict:
+    reports = []
+    for _ in range(50):
+        lat, lon = ctx.point()
+        reports.append({"latitude": lat, "longitude": lon, "category": ctx.rng.choice(CATEGORIES),
+                        "created_at": time.time()})
+    return {"method": "POST", "url": "/api/hotspots/observe", "json": {"reports": reports}}
+
+
+SCENARIOS = [
+    # Core API (app/main.py)
+    Scenario("api_health", "api", 2, lambda ctx: {"method": "GET", "url": "/health"}),
+    Scenario("api_list_reports", "api", 25, lambda ctx: {
+        "method": "GET", "url": "/api/reports",
+        "params": {"limit": 50, "skip": ctx.rng.randrange(0, 5000), "category": ctx.rng.choice(CATEGORIES)}}),
+    Scenario("api_get_report", "api", 20, lambda ctx: {"method": "GET", "url": f"/api/reports/{ctx.report_id()}"}),
+    Scenario("api_status_history", "api", 8, lambda ctx: {
+        "method": "GET", "url": f"/api/reports/{ctx.report_id()}/status-history"}),
+    Scenario("api_search", "api", 8, _search),
+    Scenario("api_analytics", "api", 3, lambda ctx: {"method": "GET", "url": "/api/analytics"}),
+    Scenario("api_hotspots", "api", 3, lambda ctx: {"method": "GET", "url": "/api/analytics/hotspots"}),
+    Scenario("api_departments", "api", 3, lambda ctx: {"method": "GET", "url": "/api/departments"}),
+    Scenario("api_create_report", "api", 10, _create_report),
+    Scenario("api_update_report", "api", 6, _update_report),
+    Scenario("api_ward_lookup", "api", 4, _ward_lookup),
+    # ML services (ml-services/app/main.py)
+    Scenario("ml_analyze_text", "ml", 6, lambda ctx: {
+        "method": "POST", "url": "/api/analyze/text",
+        "json": {"text": f"Large {ctx.rng.choice(CATEGORIES)} problem blocking the road near the market"}}),
+    Scenario("ml_predict_hotspots", "ml", 6, _predict_hotspots),
+    Scenario("ml_observe", "ml", 2, _observe),
+    Scenario("ml_models_status", "ml", 1, lambda ctx: {"method": "GET", "url": "/api/models/status"}),
+]
+
+
+async def virtual_user(
+    clients: Dict[str, httpx.AsyncClient],
+    scenarios: List[Scenario],
+    ctx: ScenarioContext,
+    deadline: float,
+    latencies: Dict[str, List[float]],
+    errors: Dict[str, int],
+    rate_limited: Dict[str, int],
+    think_time: float
+):
+    weights = [s.weight for s in scenarios]
+    user_headers = {"X-User-Id": str(uuid.uuid4())}
+    while time.perf_counter() < deadline:
+        scenario = ctx.rng.choices(scenarios, weights)[0]
+        request = scenario.build(ctx)
+        request["headers"] = {**user_headers, **request.get("headers", {})}
+        started = time.perf_counter()
+        status_code = None
+        try:
+            response = await clients[scenario.service].request(**request)
+            status_code = response.status_code
+        except httpx.HTTPError:
+            pass
+        elapsed = time.perf_counter() - started
+        if status_code == 429:
+            rate_limited[scenario.name] += 1
+        elif status_code is None or status_code >= 500:
+            errors[scenario.name] += 1
+        else:
+            latencies[scenario.name].append(elapsed)
+        if think_time:
+            await asyncio.sleep(ctx.rng.expovariate(1 / think_time))
+
+
+async def run(args) -> Dict[str, dict]:
+    ctx = ScenarioContext(args.data)
+    scenarios = [s for s in SCENARIOS if s.service in args.services and (not args.only or s.name in args.only)]
+    limits = httpx.Limits(max_connections=args.users, max_keepalive_connections=args.users)
+    clients = {
+        "api": httpx.AsyncClient(base_url=args.api_url, limits=limits, timeout=args.timeout),
+        "ml": httpx.AsyncClient(base_url=args.ml_url, limits=limits, timeout=args.timeout),
+    }
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    errors: Dict[str, int] = defaultdict(int)
+    rate_limited: Dict[str, int] = defaultdict(int)
+
+    started = time.perf_counter()
+    deadline = started + args.duration
+    try:
+        await asyncio.gather(*(
+            virtual_user(clients, scenarios, ctx, deadline, latencies, errors, rate_limited, args.think_time)
+            for _ in range(args.users)
+        ))
+    finally:
+        for client in clients.values():
+            await client.aclose()
+    elapsed = time.perf_counter() - started
+
+    results = {
+        s.name: {**summarize(latencies[s.name], elapsed, errors[s.name]), "rate_limited": rate_limited[s.name]}
+        for s in scenarios
+    }
+    results["overall"] = {
+        **summarize([x for values in latencies.values() for x in values], elapsed, sum(errors.values())),
+        "rate_limited": sum(rate_limited.values())
+    }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--api-url", default="http://localhost:8000")
+    parser.add_argument("--ml-url", default="http://localhost:8001")
+    parser.add_argument("--services", nargs="+", default=["api", "ml"], choices=["api", "ml"])
+    parser.add_argument("--only", nargs="*", help="Run only these scenario names")
+    parser.add_argument("--users", type=int, default=20, help="Concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds to run")
+    parser.add_argument("--think-time", type=float, default=0.0, help="Mean pause between requests")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--data", help="Directory produced by benchmarks.synthetic_city")
+    parser.add_argument("--output", default="load_results.json")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    write_results(args.output, "load", results)
+    print(json.dumps(results, indent=2))
+    if results["overall"]["rate_limited"]:
+        print(f"\nWARNING: {results['overall']['rate_limited']} requests were rate limited; "
+              "see the module docstring for running the API with the load generator trusted")
+
+
+if __name__ == "__main__":
+    main()
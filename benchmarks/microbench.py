@@ -0,0 +1,168 @@
+"""In-process microbenchmarks for the hot service calls of the core API.
+
+No servers or databases are needed; Redis-backed components fall back to
+their in-process implementations when Redis is not reachable. Each group is
+repeated and the median repeat kept, and a fixed reference workload is timed
+alongside so the report can factor out the speed of the machine.
+
+    python -m benchmarks.microbench --output micro.json
+"""
+import argparse
+import asyncio
+import io
+import json
+import os
+import tempfile
+import time
+from typing import Awaitable, Callable, Dict
+
+import numpy as np
+
+from .stats import summarize, write_results
+from .synthetic_city import CityGenerator
+
+
+def bench(fn: Callable[[], object], iterations: int, warmup: int = 10) -> Dict[str, float]:
+    for _ in range(min(warmup, iterations)):
+        fn()
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(iterations):
+        t = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - t)
+    return summarize(latencies, time.perf_counter() - started)
+
+
+async def bench_async(fn: Callable[[], Awaitable[object]], iterations: int, warmup: int = 10) -> Dict[str, float]:
+    for _ in range(min(warmup, iterations)):
+        await fn()
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(iterations):
+        t = time.perf_counter()
+        await fn()
+        latencies.append(time.perf_counter() - t)
+    return summarize(latencies, time.perf_counter() - started)
+
+
+def reference_benchmarks(scale: int) -> Dict[str, dict]:
+    """Workload independent of this codebase; its drift is the machine's, not ours"""
+    values = np.random.default_rng(0).random(20_000)
+
+    def workload():
+        sum(i * i for i in range(5_000))
+        np.sort(values)
+
+    return {"reference": bench(workload, 200 * scale)}
+
+
+def ward_benchmarks(scale: int) -> Dict[str, dict]:
+    from app.services.ward_index import WardIndex
+
+    city = CityGenerator(seed=3, ward_grid=30)
+    with tempfile.NamedTemporaryFile("w", suffix=".geojson", delete=False) as f:
+        json.dump(city.ward_geojson(), f)
+    try:
+        index = WardIndex(path=f.name, reload_interval=3600)
+        index.load()
+        latitudes, longitudes = city.points(1000)
+        points = iter(np.column_stack([latitudes, longitudes]).tolist() * (scale * 20 + 20))
+        return {
+            "ward_lookup": bench(lambda: index.lookup(*next(points), "garbage"), 2000 * scale),
+            "ward_lookup_many_1000": bench(
+                lambda: index.lookup_many(latitudes, longitudes, ["garbage"] * 1000), 50 * scale
+            ),
+        }
+    finally:
+        os.unlink(f.name)
+
+
+async def async_benchmarks(scale: int) -> Dict[str, dict]:
+    from app.services.admission import AdmissionController, Priority
+    from app.services.idempotency import IdempotencyStore
+    from app.services.rate_limiter import RateLimiter
+
+    limiter = RateLimiter(rate_per_minute=10**9, burst=10**9)
+    keys = iter([f"user-{i % 5000}" for i in range(20000 * scale + 100)])
+
+    admission = AdmissionController(limits={"reads": 64}, max_concurrency=128, reserved_high=8, queue_timeout=1)
+
+    async def admit_release():
+        async with admission.slot("reads", Priority.LOW):
+            pass
+
+    store = IdempotencyStore(ttl_seconds=600, lock_seconds=5)
+    response = {"id": "00000000-0000-4000-8000-000000000000", "status": "submitted"}
+
+    async def handler():
+        return response
+
+    await store.run("bench:replay", "fingerprint", handler)
+
+    return {
+        "rate_limiter_acquire": await bench_async(lambda: limiter.acquire(next(keys)), 20000 * scale),
+        "admission_slot": await bench_async(admit_release, 20000 * scale),
+        "idempotency_replay": await bench_async(
+            lambda: store.run("bench:replay", "fingerprint", handler), 20000 * scale
+        ),
+    }
+
+
+def image_benchmarks(scale: int) -> Dict[str, dict]:
+    from PIL import Image
+
+    from app.services.image_processor import _process_image, perceptual_hash
+
+    rng = np.random.default_rng(0)
+    # A noisy 12 MP photo is close to the worst case for the encoders
+    pixels = rng.integers(0, 256, size=(3000, 4000, 3), dtype=np.uint8)
+    image = Image.fromarray(pixels)
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG", quality=90)
+    data = buffer.getvalue()
+
+    return {
+        "image_pipeline_12mp": bench(lambda: _process_image(data, 320, 224, 80), 3 * scale, warmup=1),
+        "perceptual_hash_12mp": bench(lambda: perceptual_hash(image), 10 * scale, warmup=1),
+    }
+
+
+def median_of(runs) -> Dict[str, dict]:
+    """Per benchmark, the repeat with the median p50; robust to both lucky and unlucky repeats"""
+    merged = {}
+    for name in runs[0]:
+        ordered = sorted((run[name] for run in runs), key=lambda r: r.get("p50_ms", float("inf")))
+        merged[name] = ordered[len(ordered) // 2]
+    return merged
+
+
+def run(scale: int, groups, repeats: int = 5) -> Dict[str, dict]:
+    suites = {
+        "reference": reference_benchmarks,
+        "wards": ward_benchmarks,
+        "async": lambda scale: asyncio.run(async_benchmarks(scale)),
+        "images": image_benchmarks,
+    }
+    results: Dict[str, dict] = {}
+    for group in ["reference", *groups]:
+        results.update(median_of([suites[group](scale) for _ in range(repeats)]))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", type=int, default=1, help="Multiply iteration counts")
+    parser.add_argument("--groups", nargs="+", default=["wards", "async", "images"],
+                        choices=["wards", "async", "images"])
+    parser.add_argument("--repeats", type=int, default=5, help="Report the median of this many runs per group")
+    parser.add_argument("--output", default="microbench_results.json")
+    args = parser.parse_args()
+
+    results = run(args.scale, args.groups, args.repeats)
+    write_results(args.output, "microbench", results)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""Compare benchmark results against stored baselines and flag regressions.
+
+Median and p95 latency regress when they grow by more than the tolerance;
+throughput regresses when it drops by more than the tolerance. p99 is shown
+but not gated, since it rests on a handful of samples. Changes smaller than
+--min-delta-ms per operation are treated as timer noise. When both runs
+include the ``reference`` workload, timings are scaled by its change first,
+so a slower or busier machine does not read as a regression. The exit code
+is 1 when any benchmark regressed, so the script can gate CI.
+
+Baselines are timings from one machine and are not committed; record them
+on the machine that runs the comparison, e.g. from the base branch:
+
+    python -m benchmarks.report micro.json --update   # accept as baseline
+    python -m benchmarks.report micro.json load.json
+"""
+import argparse
+import json
+import os
+import sys
+from typing import Dict, List, Tuple
+
+BASELINES_PATH = os.path.join(os.path.dirname(__file__), "baselines.json")
+LATENCY_METRICS = ("p50_ms", "p95_ms", "p99_ms")
+GATED_METRICS = ("p50_ms", "p95_ms")
+REFERENCE = "reference"
+
+
+def machine_factor(current: Dict[str, dict], baseline: Dict[str, dict]) -> float:
+    """How much slower this run's machine is than the baseline's, from the reference workload"""
+    current_ref, base_ref = current.get(REFERENCE, {}), baseline.get(REFERENCE, {})
+    if current_ref.get("p50_ms") and base_ref.get("p50_ms"):
+        return current_ref["p50_ms"] / base_ref["p50_ms"]
+    return 1.0
+
+
+def compare(
+    current: Dict[str, dict],
+    baseline: Dict[str, dict],
+    tolerance: float,
+    min_delta_ms: float
+) -> Tuple[List[List[str]], List[str]]:
+    factor = machine_factor(current, baseline)
+    rows, regressions = [], []
+    for name, metrics in sorted(current.items()):
+        base = baseline.get(name)
+        if not base or not metrics.get("count"):
+            rows.append([name, "-", "-", "-", "-", "no baseline" if not base else "no samples"])
+            continue
+
+        cells, flagged = [], []
+        for metric in LATENCY_METRICS:
+            adjusted = metrics[metric] / factor
+            change = adjusted / base[metric] - 1 if base.get(metric) else 0.0
+            cells.append(f"{metrics[metric]:.3f} ({change:+.0%})")
+            if metric in GATED_METRICS and change > tolerance and adjusted - base[metric] > min_delta_ms:
+                flagged.append(metric)
+
+        throughput = metrics["throughput"] * factor
+        change = throughput / base["throughput"] - 1 if base.get("throughput") else 0.0
+        cells.append(f"{metrics['throughput']:.1f} ({change:+.0%})")
+        if change < -tolerance:
+            # Compare time per operation so the noise floor applies to throughput too
+            slowdown_ms = 1000 / throughput - 1000 / base["throughput"] if throughput else float("inf")
+            if slowdown_ms > min_delta_ms:
+                flagged.append("throughput")
+
+        if metrics.get("errors", 0) > base.get("errors", 0):
+            flagged.append("errors")
+
+        rows.append([name, *cells, "REGRESSION: " + ", ".join(flagged) if flagged else "ok"])
+        if flagged:
+            regressions.append(name)
+    return rows, regressions
+
+
+def print_table(title: str, rows: List[List[str]]):
+    header = ["benchmark", "p50 ms", "p95 ms", "p99 ms", "throughput/s", "status"]
+    widths = [max(len(str(row[i])) for row in rows + [header]) for i in range(len(header))]
+    print(f"\n{title}")
+    for row in [header] + rows:
+        print("  ".join(str(cell).ljust(width) for cell, width in zip(row, widths)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("results", nargs="+", help="JSON files written by microbench/load_test")
+    parser.add_argument("--baselines", default=BASELINES_PATH)
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative change")
+    parser.add_argument("--min-delta-ms", type=float, default=0.05,
+                        help="Ignore per-operation changes below this many milliseconds")
+    parser.add_argument("--update", action="store_true", help="Store these results as the new baselines")
+    args = parser.parse_args()
+
+    baselines = {}
+    if os.path.exists(args.baselines):
+        with open(args.baselines) as f:
+            baselines = json.load(f)
+
+    regressions = []
+    for path in args.results:
+        with open(path) as f:
+            document = json.load(f)
+        suite = document["suite"]
+        if suite not in baselines and not args.update:
+            print(f"\nNo {suite} baseline in {args.baselines}; record one on this machine with --update")
+        rows, regressed = compare(
+            document["results"], baselines.get(suite, {}), args.tolerance, args.min_delta_ms
+        )
+        factor = machine_factor(document["results"], baselines.get(suite, {}))
+        print_table(
+            f"{suite} ({path}, {document['timestamp']}, python {document['python']}, machine x{factor:.2f})", rows
+        )
+        regressions.extend(f"{suite}.{name}" for name in regressed)
+        if args.update:
+            baselines[suite] = document["results"]
+
+    if args.update:
+        with open(args.baselines, "w") as f:
+            json.dump(baselines, f, indent=2, sort_keys=True)
+        print(f"\nBaselines updated in {args.baselines}")
+        return
+
+    if regressions:
+        print(f"\n{len(regressions)} regression(s): {', '.join(regressions)}")
+        sys.exit(1)
+    print("\nNo regressions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Import-time and startup benchmark for the core API, with a time budget.
+
+Every run uses a fresh interpreter, imports app.main and runs the FastAPI
+startup handlers, the same work a new container does before it can serve.
+The run fails if the p50 exceeds the budget or if any heavy optional
+dependency was imported along the way.
+
+    python -m benchmarks.startup --runs 10 --budget-ms 1500 --output startup_results.json
+"""
+import argparse
+import json
+import subprocess
+import sys
+
+from .stats import summarize, write_results
+
+# Must only be imported by the services that need them, on first use
+HEAVY_MODULES = [
+    "torch", "torchvision", "transformers", "cv2", "sklearn", "pandas",
+    "web3", "eth_account", "boto3", "botocore", "ipfshttpclient", "PIL", "httpx",
+]
+
+PROBE = """
+import asyncio, json, logging, sys, time
+logging.disable(logging.CRITICAL)
+started = time.perf_counter()
+import app.main
+imported = time.perf_counter()
+asyncio.run(app.main.app.router.startup())
+ready = time.perf_counter()
+print(json.dumps({
+    "import_s": imported - started,
+    "startup_s": ready - imported,
+    "total_s": ready - started,
+    "heavy_modules": [m for m in %r if m in sys.modules],
+}))
+""" % (HEAVY_MODULES,)
+
+
+def probe() -> dict:
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE], capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def slowest_imports(limit: int = 15):
+    """Modules with the largest cumulative import time from python -X importtime"""
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"], capture_output=True, text=True, check=True
+    ).stderr
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = (part.strip() for part in line.split(":", 1)[1].split("|"))
+        rows.append((int(cumulative), name))
+    rows.sort(reverse=True)
+    return [(name, round(us / 1000, 1)) for us, name in rows[:limit]]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--budget-ms", type=float, default=1500.0, help="Budget for p50 import + startup")
+    parser.add_argument("--output", default="startup_results.json")
+    args = parser.parse_args()
+
+    samples = [probe() for _ in range(args.runs)]
+    results = {
+        metric: summarize([s[f"{metric}_s"] for s in samples], sum(s[f"{metric}_s"] for s in samples))
+        for metric in ("import", "startup", "total")
+    }
+    heavy = sorted({m for s in samples for m in s["heavy_modules"]})
+
+    write_results(args.output, "startup", {f"api_{name}": value for name, value in results.items()})
+    print(json.dumps(results, indent=2))
+    print("\nSlowest imports, cumulative ms:")
+    for name, ms in slowest_imports():
+        print(f"  {ms:8.1f}  {name}")
+
+    failures = []
+    if results["total"]["p50_ms"] > args.budget_ms:
+        failures.append(f"p50 startup {results['total']['p50_ms']:.0f} ms exceeds budget {args.budget_ms:.0f} ms")
+    if heavy:
+        failures.append(f"heavy modules imported at startup: {', '.join(heavy)}")
+    if failures:
+        print("\nFAIL: " + "; ".join(failures))
+        sys.exit(1)
+    print(f"\nOK: p50 {results['total']['p50_ms']:.0f} ms within {args.budget_ms:.0f} ms budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+"""Latency/throughput summaries shared by the benchmark scripts."""
+import json
+import platform
+import time
+from typing import Dict, Iterable
+
+import numpy as np
+
+
+def summarize(latencies_seconds: Iterable[float], elapsed_seconds: float, errors: int = 0) -> Dict[str, float]:
+    """p50/p95/p99 in milliseconds plus throughput for one benchmark"""
+    samples = np.asarray(list(latencies_seconds), dtype=np.float64)
+    if samples.size == 0:
+        return {"count": 0, "errors": errors, "throughput": 0.0}
+    p50, p95, p99 = np.percentile(samples, [50, 95, 99]) * 1000
+    return {
+        "count": int(samples.size),
+        "errors": errors,
+        "throughput": round(samples.size / elapsed_seconds, 2) if elapsed_seconds > 0 else 0.0,
+        "mean_ms": round(float(samples.mean() * 1000), 4),
+        "p50_ms": round(float(p50), 4),
+        "p95_ms": round(float(p95), 4),
+        "p99_ms": round(float(p99), 4),
+    }
+
+
+def write_results(path: str, suite: str, results: Dict[str, Dict[str, float]]):
+    document = {
+        "suite": suite,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": results,
+    }
+    with open(path, "w") as f:
+        json.dump(document, f, indent=2)
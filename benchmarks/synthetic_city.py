@@ -0,0 +1,308 @@
+"""Generate a reproducible synthetic city for load and benchmark runs.
+
+Writes users, departments, staff, reports and status updates as CSV files
+whose columns match the SQLAlchemy models in app/database.py, plus a ward
+boundaries GeoJSON for the ward index. Reports are produced in chunks so
+millions of rows fit in constant memory; --load-db streams the CSVs into
+PostgreSQL with COPY.
+
+    python -m benchmarks.synthetic_city --reports 2000000 --out bench_data
+    python -m benchmarks.synthetic_city --reports 2000000 --out bench_data --load-db
+"""
+import argparse
+import csv
+import json
+import os
+from datetime import datetime
+
+import numpy as np
+
+CATEGORIES = np.array(["pothole", "garbage", "streetlight", "water", "road", "other"])
+CATEGORY_WEIGHTS = np.array([0.28, 0.30, 0.14, 0.12, 0.10, 0.06])
+STATUSES = ["submitted", "verified", "assigned", "in_progress", "resolved", "closed"]
+DEPARTMENTS = [
+    ("Public Works", "pothole"),
+    ("Sanitation", "garbage"),
+    ("Electrical", "streetlight"),
+    ("Water Supply", "water"),
+    ("Roads & Transport", "road"),
+    ("General Administration", "other"),
+]
+ROLES = np.array(["admin", "supervisor", "field_worker"])
+
+REPORT_COLUMNS = [
+    "id", "title", "description", "category", "priority", "severity_score",
+    "latitude", "longitude", "location", "ward_number", "status", "reporter_id",
+    "assigned_department_id", "assigned_staff_id", "created_at", "verified_at",
+    "assigned_at", "resolved_at", "ai_category_confidence", "is_duplicate",
+]
+STATUS_COLUMNS = ["id", "report_id", "old_status", "new_status", "comment", "updated_by", "created_at"]
+
+
+def uuids(rng: np.random.Generator, n: int):
+    """Reproducible version-4 UUID strings"""
+    raw = rng.integers(0, 256, size=(n, 16), dtype=np.uint8)
+    raw[:, 6] = (raw[:, 6] & 0x0F) | 0x40
+    raw[:, 8] = (raw[:, 8] & 0x3F) | 0x80
+    h = raw.tobytes().hex()
+    return [
+        f"{h[i:i + 8]}-{h[i + 8:i + 12]}-{h[i + 12:i + 16]}-{h[i + 16:i + 20]}-{h[i + 20:i + 32]}"
+        for i in range(0, 32 * n, 32)
+    ]
+
+
+class CityGenerator:
+    """Geo-distributed city with a ward grid and clustered report hotspots"""
+
+    def __init__(self, seed: int = 42, center=(28.6139, 77.2090), radius_deg: float = 0.2, ward_grid: int = 10):
+        self.rng = np.random.default_rng(seed)
+        self.center = center
+        self.radius = radius_deg
+        self.ward_grid = ward_grid
+        # Hotspots get most reports; the rest are spread across the city
+        self.hotspots = self.center + self.rng.uniform(-radius_deg, radius_deg, size=(200, 2))
+        self.hotspot_weights = self.rng.pareto(1.5, 200) + 1
+        self.hotspot_weights /= self.hotspot_weights.sum()
+
+    def ward_of(self, latitudes: np.ndarray, longitudes: np.ndarray) -> np.ndarray:
+        cell = 2 * self.radius / self.ward_grid
+        row = np.clip(((latitudes - self.center[0] + self.radius) // cell).astype(int), 0, self.ward_grid - 1)
+        col = np.clip(((longitudes - self.center[1] + self.radius) // cell).astype(int), 0, self.ward_grid - 1)
+        return row * self.ward_grid + col + 1
+
+    def ward_geojson(self) -> dict:
+        cell = 2 * self.radius / self.ward_grid
+        features = []
+        for row in range(self.ward_grid):
+            for col in range(self.ward_grid):
+                lat0 = self.center[0] - self.radius + row * cell
+                lon0 = self.center[1] - self.radius + col * cell
+                ward = row * self.ward_grid + col + 1
+                features.append({
+                    "type": "Feature",
+                    "properties": {
+                        "ward_number": str(ward),
+                        "department_id": len(DEPARTMENTS),
+                        "departments": {category: i + 1 for i, (_, category) in enumerate(DEPARTMENTS)},
+                    },
+                    "geometry": {
+                        "type": "Polygon",
+                        "coordinates": [[
+                            [lon0, lat0], [lon0 + cell, lat0], [lon0 + cell, lat0 + cell],
+                            [lon0, lat0 + cell], [lon0, lat0],
+                        ]],
+                    },
+                })
+        return {"type": "FeatureCollection", "features": features}
+
+    def points(self, n: int):
+        clustered = self.rng.random(n) < 0.7
+        hotspot = self.rng.choice(len(self.hotspots), size=n, p=self.hotspot_weights)
+        latitudes = np.where(
+            clustered,
+            self.hotspots[hotspot, 0] + self.rng.normal(0, 0.003, n),
+            self.center[0] + self.rng.uniform(-self.radius, self.radius, n),
+        )
+        longitudes = np.where(
+            clustered,
+            self.hotspots[hotspot, 1] + self.rng.normal(0, 0.003, n),
+            self.center[1] + self.rng.uniform(-self.radius, self.radius, n),
+        )
+        return latitudes, longitudes
+
+    def users(self, n: int):
+        ids = uuids(self.rng, n)
+        has_email = self.rng.random(n) < 0.6
+        created = datetime(2024, 1, 1)
+        for i in range(n):
+            yield [
+                ids[i], f"+91{7_000_000_000 + i}", f"citizen{i}@example.org" if has_email[i] else "",
+                f"Citizen {i}", "true", "false", created.isoformat(),
+            ]
+
+    def departments(self):
+        for i, (name, category) in enumerate(DEPARTMENTS, start=1):
+            yield [i, name, f"Handles {category} issues", f"{category}@city.gov.in", f"+9111{i:08d}", "true"]
+
+    def staff(self, per_department: int):
+        n = per_department * len(DEPARTMENTS)
+        ids = uuids(self.rng, n)
+        roles = self.rng.choice(ROLES, n, p=[0.05, 0.2, 0.75])
+        for i in range(n):
+            department_id = i // per_department + 1
+            yield [
+                ids[i], f"staff{i}@city.gov.in", f"Staff {i}", department_id, roles[i], "true",
+                datetime(2024, 1, 1).isoformat(),
+            ]
+
+    def reports(self, n: int, user_ids, staff_by_department, days: int, chunk_size: int = 100_000):
+        """Yield (report_rows, status_rows) chunks; per-row work is vectorised with NumPy"""
+        epoch = np.datetime64("2024-01-01T00:00:00", "ms")
+        user_ids = np.asarray(user_ids)
+        staff_pools = [np.asarray(staff_by_department[d + 1]) for d in range(len(DEPARTMENTS))]
+        statuses = np.array(STATUSES)
+
+        for offset in range(0, n, chunk_size):
+            size = min(chunk_size, n - offset)
+            ids = np.array(uuids(self.rng, size))
+            latitudes, longitudes = self.points(size)
+            wards = self.ward_of(latitudes, longitudes).astype(str)
+            category_idx = self.rng.choice(len(CATEGORIES), size=size, p=CATEGORY_WEIGHTS)
+            categories = CATEGORIES[category_idx]
+            # How far through the workflow each report has progressed
+            stages = self.rng.choice(len(STATUSES), size=size, p=[0.15, 0.15, 0.15, 0.15, 0.25, 0.15])
+
+            # Transition timestamps: creation plus exponential time spent in each stage
+            created_ms = self.rng.uniform(0, days * 86_400_000, size).astype(np.int64)
+            stage_ms = (self.rng.exponential(18, size=(size, len(STATUSES))) * 3_600_000).astype(np.int64)
+            stage_ms[:, 0] = created_ms
+            transitions = np.datetime_as_string(epoch + np.cumsum(stage_ms, axis=1).astype("timedelta64[ms]"))
+
+            def stamp(stage):
+                return np.where(stages >= stage, transitions[:, stage], "")
+
+            assigned = stages >= 2
+            staff_ids = np.array([
+                pool[i % len(pool)] for i, pool in zip(range(size), (staff_pools[c] for c in category_idx))
+            ])
+            staff_ids = np.where(assigned, staff_ids, "")
+            department_ids = np.where(assigned, (category_idx + 1).astype(str), "")
+            lat_text = np.char.mod("%.6f", latitudes)
+            lon_text = np.char.mod("%.6f", longitudes)
+
+            report_rows = zip(
+                ids,
+                np.char.add(np.char.add(np.char.title(categories), " near ward "), wards),
+                np.char.add(np.char.add("Synthetic ", categories), " report"),
+                categories,
+                self.rng.integers(1, 6, size),
+                self.rng.random(size).round(3),
+                lat_text,
+                lon_text,
+                np.char.add(np.char.add(np.char.add(np.char.add("SRID=4326;POINT(", lon_text), " "), lat_text), ")"),
+                wards,
+                statuses[stages],
+                user_ids[self.rng.integers(0, len(user_ids), size)],
+                department_ids,
+                staff_ids,
+                transitions[:, 0],
+                stamp(1),
+                stamp(2),
+                stamp(4),
+                self.rng.uniform(0.5, 1.0, size).round(3),
+                np.where(self.rng.random(size) < 0.04, "true", "false"),
+            )
+
+            # One status update per completed transition
+            report_idx = np.repeat(np.arange(size), stages)
+            stage_idx = np.concatenate([np.arange(1, k + 1) for k in stages]) if report_idx.size else report_idx
+            status_rows = zip(
+                uuids(self.rng, report_idx.size),
+                ids[report_idx],
+                statuses[stage_idx - 1],
+                statuses[stage_idx],
+                np.full(report_idx.size, ""),
+                staff_ids[report_idx],
+                transitions[report_idx, stage_idx],
+            )
+            yield list(report_rows), list(status_rows)
+
+
+def write_csv(path: str, header, rows):
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        writer.writerows(rows)
+
+
+def generate(args) -> dict:
+    os.makedirs(args.out, exist_ok=True)
+    city = CityGenerator(seed=args.seed)
+
+    with open(os.path.join(args.out, "wards.geojson"), "w") as f:
+        json.dump(city.ward_geojson(), f)
+
+    write_csv(os.path.join(args.out, "departments.csv"),
+              ["id", "name", "description", "contact_email", "contact_phone", "is_active"], city.departments())
+
+    staff_rows = list(city.staff(args.staff_per_department))
+    write_csv(os.path.join(args.out, "staff.csv"),
+              ["id", "email", "name", "department_id", "role", "is_active", "created_at"], staff_rows)
+    staff_by_department = {}
+    for row in staff_rows:
+        staff_by_department.setdefault(row[3], []).append(row[0])
+
+    user_rows = list(city.users(args.users))
+    write_csv(os.path.join(args.out, "users.csv"),
+              ["id", "phone_number", "email", "name", "is_verified", "is_anonymous", "created_at"], user_rows)
+
+    reports_path = os.path.join(args.out, "reports.csv")
+    status_path = os.path.join(args.out, "status_updates.csv")
+    report_count = status_count = 0
+    with open(reports_path, "w", newline="") as rf, open(status_path, "w", newline="") as sf:
+        report_writer, status_writer = csv.writer(rf), csv.writer(sf)
+        report_writer.writerow(REPORT_COLUMNS)
+        status_writer.writerow(STATUS_COLUMNS)
+        for report_rows, status_rows in city.reports(
+            args.reports, [row[0] for row in user_rows], staff_by_department, args.days
+        ):
+            report_writer.writerows(report_rows)
+            status_writer.writerows(status_rows)
+            report_count += len(report_rows)
+            status_count += len(status_rows)
+            print(f"  {report_count:,} reports written", end="\r", flush=True)
+    print()
+
+    return {
+        "users": len(user_rows),
+        "departments": len(DEPARTMENTS),
+        "staff": len(staff_rows),
+        "reports": report_count,
+        "status_updates": status_count,
+    }
+
+
+def load_into_database(out: str, database_url: str):
+    """COPY the generated CSVs into PostgreSQL (tables must already exist)"""
+    import psycopg2
+
+    tables = [
+        ("departments", "departments.csv"),
+        ("users", "users.csv"),
+        ("staff", "staff.csv"),
+        ("reports", "reports.csv"),
+        ("status_updates", "status_updates.csv"),
+    ]
+    connection = psycopg2.connect(database_url)
+    try:
+        with connection, connection.cursor() as cursor:
+            for table, filename in tables:
+                with open(os.path.join(out, filename)) as f:
+                    header = f.readline().strip()
+                    cursor.copy_expert(f"COPY {table} ({header}) FROM STDIN WITH (FORMAT csv, NULL '')", f)
+                print(f"  loaded {table}")
+            cursor.execute("SELECT setval('departments_id_seq', (SELECT MAX(id) FROM departments))")
+    finally:
+        connection.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--out", default="bench_data")
+    parser.add_argument("--users", type=int, default=50_000)
+    parser.add_argument("--staff-per-department", type=int, default=40)
+    parser.add_argument("--reports", type=int, default=1_000_000)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--load-db", action="store_true", help="COPY the output into DATABASE_URL")
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL"))
+    args = parser.parse_args()
+
+    counts = generate(args)
+    print(json.dumps(counts, indent=2))
+    if args.load_db:
+        load_into_database(args.out, args.database_url)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""Initial schema, previously created by create_tables() at API startup
+
+Databases that were already built by create_tables() have exactly these
+tables; mark them as migrated with `alembic stamp 0001` and then run
+`alembic upgrade head` for the later revisions.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+import geoalchemy2
+from sqlalchemy.dialects import postgresql
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute("CREATE EXTENSION IF NOT EXISTS postgis")
+
+    op.create_table(
+        "users",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("phone_number", sa.String(15)),
+        sa.Column("email", sa.String(255), nullable=True),
+        sa.Column("name", sa.String(255), nullable=True),
+        sa.Column("is_verified", sa.Boolean()),
+        sa.Column("is_anonymous", sa.Boolean()),
+        sa.Column("created_at", sa.DateTime()),
+    )
+    op.create_index("ix_users_phone_number", "users", ["phone_number"], unique=True)
+    op.create_index("ix_users_email", "users", ["email"], unique=True)
+
+    op.create_table(
+        "departments",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(255)),
+        sa.Column("description", sa.Text(), nullable=True),
+        sa.Column("contact_email", sa.String(255)),
+        sa.Column("contact_phone", sa.String(15)),
+        sa.Column("is_active", sa.Boolean()),
+    )
+    op.create_index("ix_departments_id", "departments", ["id"])
+    op.create_index("ix_departments_name", "departments", ["name"], unique=True)
+
+    op.create_table(
+        "staff",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("email", sa.String(255)),
+        sa.Column("name", sa.String(255)),
+        sa.Column("department_id", sa.Integer(), sa.ForeignKey("departments.id")),
+        sa.Column("role", sa.String(100)),
+        sa.Column("is_active", sa.Boolean()),
+        sa.Column("created_at", sa.DateTime()),
+    )
+    op.create_index("ix_staff_email", "staff", ["email"], unique=True)
+
+    op.create_table(
+        "reports",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("blockchain_tx_hash", sa.String(66), nullable=True, unique=True),
+        sa.Column("title", sa.String(255)),
+        sa.Column("description", sa.Text()),
+        sa.Column("category", sa.String(100)),
+        sa.Column("priority", sa.Integer()),
+        sa.Column("severity_score", sa.Float(), nullable=True),
+        sa.Column("latitude", sa.Float()),
+        sa.Column("longitude", sa.Float()),
+        sa.Column("location", geoalchemy2.Geometry("POINT", spatial_index=False)),
+        sa.Column("address", sa.Text(), nullable=True),
+        sa.Column("ward_number", sa.String(50), nullable=True),
+        sa.Column("image_urls", sa.Text(), nullable=True),
+        sa.Column("ipfs_hash", sa.String(100), nullable=True),
+        sa.Column("status", sa.String(50)),
+        sa.Column("reporter_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id")),
+        sa.Column("assigned_department_id", sa.Integer(), sa.ForeignKey("departments.id"), nullable=True),
+        sa.Column("assigned_staff_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("staff.id"), nullable=True),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("verified_at", sa.DateTime(), nullable=True),
+        sa.Column("assigned_at", sa.DateTime(), nullable=True),
+        sa.Column("resolved_at", sa.DateTime(), nullable=True),
+        sa.Column("ai_category_confidence", sa.Float(), nullable=True),
+        sa.Column("is_duplicate", sa.Boolean()),
+        sa.Column("duplicate_of", postgresql.UUID(as_uuid=True), sa.ForeignKey("reports.id"), nullable=True),
+    )
+    op.create_index("idx_reports_location", "reports", ["location"], postgresql_using="gist")
+
+    op.create_table(
+        "status_updates",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("report_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("reports.id")),
+        sa.Column("old_status", sa.String(50)),
+        sa.Column("new_status", sa.String(50)),
+        sa.Column("comment", sa.Text(), nullable=True),
+        sa.Column("updated_by", postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("blockchain_tx_hash", sa.String(66), nullable=True),
+    )
+
+
+def downgrade():
+    op.drop_table("status_updates")
+    op.drop_index("idx_reports_location", table_name="reports")
+    op.drop_table("reports")
+    op.drop_table("staff")
+    op.drop_table("departments")
+    op.drop_table("users")
@@ -0,0 +1,39 @@
+"""Notification outbox written alongside status updates
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "notification_outbox",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("channel", sa.String(20)),
+        sa.Column("recipient", sa.String(255)),
+        sa.Column("subject", sa.String(255), nullable=True),
+        sa.Column("message", sa.Text()),
+        sa.Column("dedup_key", sa.String(255)),
+        sa.Column("status", sa.String(20)),
+        sa.Column("attempts", sa.Integer()),
+        sa.Column("next_attempt_at", sa.DateTime()),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("sent_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_notification_outbox_dedup_key", "notification_outbox", ["dedup_key"], unique=True)
+    op.create_index("ix_notification_outbox_status", "notification_outbox", ["status"])
+    op.create_index("ix_notification_outbox_next_attempt_at", "notification_outbox", ["next_attempt_at"])
+
+
+def downgrade():
+    op.drop_table("notification_outbox")
@@ -0,0 +1,23 @@
+"""Thumbnail URLs and perceptual hashes stored with each report
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("reports", sa.Column("thumbnail_urls", sa.Text(), nullable=True))
+    op.add_column("reports", sa.Column("image_hashes", sa.Text(), nullable=True))
+
+
+def downgrade():
+    op.drop_column("reports", "image_hashes")
+    op.drop_column("reports", "thumbnail_urls")
@@ -1,14 +1,19 @@
-from fastapi import FastAPI, UploadFile, File, HTTPException
+from fastapi import FastAPI, UploadFile, File, Header, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 import uvicorn
 import logging
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 import asyncio
+import os
+import secrets
 
 from .services.image_classifier import ImageClassifierService
 from .services.nlp_processor import NLPProcessorService
 from .services.duplicate_detector import DuplicateDetectorService
 from .services.priority_scorer import PriorityScorerService
+from .services.admission import InferenceAdmission
+from .services.hotspot_engine import HotspotEngine, CATEGORY_INDEX
 from .models.schemas import (
     ReportAnalysisRequest,
     ReportAnalysisResponse,
@@ -27,21 +32,47 @@ app = FastAPI(
     version="1.0.0"
 )
 
-# CORS middleware
+# Initialize ML services
+image_classifier = ImageClassifierService()
+nlp_processor = NLPProcessorService()
+duplicate_detector = DuplicateDetectorService()
+priority_scorer = PriorityScorerService()
+admission = InferenceAdmission()
+hotspot_engine = HotspotEngine()
+HOTSPOT_MODEL_PATH = os.getenv("HOTSPOT_MODEL_PATH", "./models/hotspots.npz")
+HOTSPOT_CHECKPOINT_SECONDS = float(os.getenv("HOTSPOT_CHECKPOINT_SECONDS", "300"))
+# Shared with the core API's bootstrap; resets are refused while unset
+HOTSPOT_RESET_TOKEN = os.getenv("HOTSPOT_RESET_TOKEN")
+
+@app.middleware("http")
+async def admission_control(request: Request, call_next):
+    """Shed inference requests that cannot get a worker slot in time"""
+    if request.url.path == "/health" or request.method == "OPTIONS":
+        return await call_next(request)
+    
+    route_class = admission.route_class(request.url.path)
+    if not await admission.try_acquire(route_class):
+        return JSONResponse(
+            status_code=503,
+            content={"detail": f"Server busy: {route_class} requests are being shed"},
+            headers={"Retry-After": str(max(1, round(admission.queue_timeout)))}
+        )
+    try:
+        return await call_next(request)
+    finally:
+        admission.release(route_class)
+
+# CORS middleware, added last so it wraps admission control: preflights never take
+# an inference slot and 503 responses still carry CORS headers
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Retry-After"],
 )
 
-# Initialize ML services
-image_classifier = ImageClassifierService()
-nlp_processor = NLPProcessorService()
-duplicate_detector = DuplicateDetectorService()
-priority_scorer = PriorityScorerService()
-
 @app.on_event("startup")
 async def startup_event():
     """Load ML models on startup"""
@@ -54,8 +85,37 @@ async def startup_event():
         priority_scorer.load_model()
     )
     
+    if hotspot_engine.load(HOTSPOT_MODEL_PATH):
+        logger.info(f"Hotspot grid restored with {hotspot_engine.n_cells} cells")
+    else:
+        logger.warning(
+            "No saved hotspot grid; rebuild it from the reports table with "
+            "`python -m app.services.hotspot_feed` in the core API"
+        )
+    app.state.hotspot_checkpoint_task = asyncio.create_task(checkpoint_hotspots())
+    
     logger.info("All ML models loaded successfully")
 
+async def save_hotspots():
+    if hotspot_engine.n_cells:
+        # Copy on the event loop so ingestion never races the writer thread
+        await asyncio.to_thread(HotspotEngine.write_state, HOTSPOT_MODEL_PATH, hotspot_engine.state())
+
+async def checkpoint_hotspots():
+    """Persist the hotspot grid periodically so a crash loses at most one interval"""
+    while True:
+        await asyncio.sleep(HOTSPOT_CHECKPOINT_SECONDS)
+        try:
+            await save_hotspots()
+        except Exception as e:
+            logger.error(f"Hotspot checkpoint failed: {str(e)}")
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Persist the hotspot grid so restarts keep the fitted model"""
+    app.state.hotspot_checkpoint_task.cancel()
+    await save_hotspots()
+
 @app.get("/health")
 async def health_check():
     return {
@@ -177,20 +237,59 @@ async def detect_duplicates(request: dict):
 
 @app.post("/api/predict/hotspots")
 async def predict_hotspots(request: dict):
-    """Predict potential issue hotspots"""
+    """Predict potential issue hotspots inside a bounding box"""
     try:
-        # This would use historical data and ML models to predict hotspots
-        # For now, return a placeholder response
-        return {
-            "predicted_hotspots": [],
-            "confidence": 0.0,
-            "prediction_horizon_days": 7
-        }
+        category = request.get("category")
+        if category is not None and category not in CATEGORY_INDEX:
+            raise HTTPException(status_code=400, detail=f"Unknown category: {category}")
+        
+        return hotspot_engine.predict(
+            min_lat=float(request.get("min_lat", -90)),
+            min_lon=float(request.get("min_lon", -180)),
+            max_lat=float(request.get("max_lat", 90)),
+            max_lon=float(request.get("max_lon", 180)),
+            horizon_days=int(request.get("horizon_days", 7)),
+            category=category,
+            limit=int(request.get("limit", 20)),
+            min_expected=float(request.get("min_expected", 0.5))
+        )
         
+    except HTTPException:
+        raise
+    except (TypeError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Hotspot prediction failed: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/api/hotspots/observe")
+async def observe_reports(request: dict):
+    """Feed new or historical reports into the hotspot grid"""
+    try:
+        reports = request.get("reports", [])
+        ingested = hotspot_engine.observe(reports)
+        return {
+            "ingested": ingested,
+            "dropped": len(reports) - ingested,
+            "cells": hotspot_engine.n_cells,
+            "current_day": hotspot_engine.current_day
+        }
+        
+    except Exception as e:
+        logger.error(f"Hotspot ingestion failed: {str(e)}")
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.post("/api/hotspots/reset")
+async def reset_hotspots(x_reset_token: Optional[str] = Header(None, alias="X-Reset-Token")):
+    """Clear the hotspot grid before a bootstrap from the reports table"""
+    if not HOTSPOT_RESET_TOKEN:
+        raise HTTPException(status_code=403, detail="Hotspot reset is disabled; set HOTSPOT_RESET_TOKEN")
+    if not x_reset_token or not secrets.compare_digest(x_reset_token, HOTSPOT_RESET_TOKEN):
+        raise HTTPException(status_code=403, detail="Invalid reset token")
+    hotspot_engine.reset()
+    logger.info("Hotspot grid reset for a rebuild")
+    return {"status": "reset"}
+
 @app.get("/api/models/status")
 async def get_models_status():
     """Get status of all ML models"""
@@ -214,6 +313,11 @@ async def get_models_status():
             "loaded": priority_scorer.is_loaded,
             "model_version": priority_scorer.model_version,
             "last_updated": priority_scorer.last_updated
+        },
+        "hotspot_engine": {
+            "loaded": hotspot_engine.is_loaded,
+            "model_version": hotspot_engine.model_version,
+            "last_updated": hotspot_engine.last_updated
         }
     }
 
@@ -0,0 +1,40 @@
+import asyncio
+import os
+from typing import Dict, Optional
+
+
+class InferenceAdmission:
+    """Bounded concurrency per route class for the inference endpoints.
+
+    Model calls are CPU/GPU bound, so letting every request in at once only
+    makes all of them slow. Requests wait briefly for a slot and are shed with
+    a Retry-After hint once the wait budget is spent.
+    """
+
+    DEFAULT_LIMITS = {"analyze": 8, "predict": 4, "default": 32}
+
+    def __init__(self, limits: Optional[Dict[str, int]] = None, queue_timeout: Optional[float] = None):
+        limits = limits or {
+            name: int(os.getenv(f"ML_MAX_CONCURRENT_{name.upper()}", default))
+            for name, default in self.DEFAULT_LIMITS.items()
+        }
+        self.queue_timeout = queue_timeout or float(os.getenv("ML_QUEUE_TIMEOUT", "2.0"))
+        self._semaphores = {name: asyncio.Semaphore(limit) for name, limit in limits.items()}
+
+    @staticmethod
+    def route_class(path: str) -> str:
+        if path.startswith(("/api/analyze", "/api/detect")):
+            return "analyze"
+        if path.startswith("/api/predict"):
+            return "predict"
+        return "default"
+
+    async def try_acquire(self, route_class: str) -> bool:
+        try:
+            await asyncio.wait_for(self._semaphores[route_class].acquire(), self.queue_timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def release(self, route_class: str):
+        self._semaphores[route_class].release()
@@ -0,0 +1,420 @@
+import logging
+import os
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+CATEGORIES = ("pothole", "garbage", "streetlight", "water", "road", "other")
+CATEGORY_INDEX = {name: i for i, name in enumerate(CATEGORIES)}
+
+GEOHASH_ALPHABET = "0123456789bcdefghjkmnpqrstuvwxyz"
+SECONDS_PER_DAY = 86400
+# Reports dated further ahead of the server clock than this are rejected
+MAX_FUTURE_DAYS = 1
+# Bounds on prediction requests; the horizon sizes per-cell arrays
+MAX_HORIZON_DAYS = 90
+MAX_PREDICTION_LIMIT = 500
+
+
+def geohash_cells(latitudes: np.ndarray, longitudes: np.ndarray, precision: int) -> np.ndarray:
+    """Vectorised geohash encoding; returns the interleaved bits as int64 cell ids"""
+    total_bits = 5 * precision
+    lon_bits = (total_bits + 1) // 2
+    lat_bits = total_bits // 2
+
+    lon = np.clip((np.asarray(longitudes, dtype=np.float64) + 180.0) / 360.0, 0.0, np.nextafter(1.0, 0.0))
+    lat = np.clip((np.asarray(latitudes, dtype=np.float64) + 90.0) / 180.0, 0.0, np.nextafter(1.0, 0.0))
+    lon_int = (lon * (1 << lon_bits)).astype(np.int64)
+    lat_int = (lat * (1 << lat_bits)).astype(np.int64)
+
+    # Geohash starts with a longitude bit and alternates from the most significant end
+    cells = np.zeros(lon_int.shape, dtype=np.int64)
+    for i in range(total_bits):
+        if i % 2 == 0:
+            bit = (lon_int >> (lon_bits - 1 - i // 2)) & 1
+        else:
+            bit = (lat_int >> (lat_bits - 1 - i // 2)) & 1
+        cells = (cells << 1) | bit
+    return cells
+
+
+def cell_centroids(cells: np.ndarray, precision: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Latitude/longitude of the centre of each geohash cell"""
+    total_bits = 5 * precision
+    lon_bits = (total_bits + 1) // 2
+    lat_bits = total_bits // 2
+
+    cells = np.asarray(cells, dtype=np.int64)
+    lon_int = np.zeros(cells.shape, dtype=np.int64)
+    lat_int = np.zeros(cells.shape, dtype=np.int64)
+    for i in range(total_bits):
+        bit = (cells >> (total_bits - 1 - i)) & 1
+        if i % 2 == 0:
+            lon_int = (lon_int << 1) | bit
+        else:
+            lat_int = (lat_int << 1) | bit
+
+    lon = (lon_int + 0.5) / (1 << lon_bits) * 360.0 - 180.0
+    lat = (lat_int + 0.5) / (1 << lat_bits) * 180.0 - 90.0
+    return lat, lon
+
+
+def cell_to_geohash(cell: int, precision: int) -> str:
+    chars = []
+    for shift in range(5 * (precision - 1), -1, -5):
+        chars.append(GEOHASH_ALPHABET[(cell >> shift) & 31])
+    return "".join(chars)
+
+
+def to_day(timestamp: Any) -> int:
+    """Days since the Unix epoch (UTC) for a datetime, ISO string or epoch seconds"""
+    if isinstance(timestamp, (int, float)):
+        return int(timestamp // SECONDS_PER_DAY)
+    if isinstance(timestamp, str):
+        timestamp = datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    return int(timestamp.timestamp() // SECONDS_PER_DAY)
+
+
+class HotspotEngine:
+    """Spatio-temporal report grid with an incrementally fitted forecast.
+
+    Reports are bucketed into geohash cell x day x category counts held in a
+    ring buffer of ``history_days``. When a day closes, every cell/category
+    level and damped trend are updated Holt-Winters style (multiplicative
+    day-of-week factors shared per category), so predictions are a single
+    vectorised product over the cells inside the query box. Reports arriving
+    late for an already closed day are folded into the fitted state; reports
+    dated in the future or before the retained window are dropped.
+    """
+
+    def __init__(
+        self,
+        precision: int = 6,
+        history_days: int = 56,
+        alpha: float = 0.1,
+        beta: float = 0.05,
+        gamma: float = 0.1,
+        damping: float = 0.98,
+        initial_capacity: int = 1024
+    ):
+        self.precision = precision
+        self.history_days = history_days
+        self.alpha = alpha
+        self.beta = beta
+        self.gamma = gamma
+        self.damping = damping
+
+        self.model_version = "holt-winters-damped-2"
+        self.last_updated: Optional[str] = None
+
+        self.reset(initial_capacity)
+
+    def reset(self, initial_capacity: int = 1024):
+        """Drop all cells and fitted state, e.g. before rebuilding from the reports table"""
+        n_categories = len(CATEGORIES)
+        self._cell_index: Dict[int, int] = {}
+        self.cells = np.zeros(initial_capacity, dtype=np.int64)
+        self.latitudes = np.zeros(initial_capacity, dtype=np.float32)
+        self.longitudes = np.zeros(initial_capacity, dtype=np.float32)
+        self.counts = np.zeros((initial_capacity, self.history_days, n_categories), dtype=np.uint16)
+        self.level = np.zeros((initial_capacity, n_categories), dtype=np.float32)
+        self.trend = np.zeros((initial_capacity, n_categories), dtype=np.float32)
+        self.season = np.ones((n_categories, 7), dtype=np.float32)
+        self.current_day: Optional[int] = None
+        self.days_fitted = 0
+        self.is_loaded = False
+
+    @property
+    def n_cells(self) -> int:
+        return len(self._cell_index)
+
+    # Grid maintenance
+    def _ensure_capacity(self, required: int):
+        capacity = self.cells.shape[0]
+        if required <= capacity:
+            return
+        new_capacity = max(required, capacity * 2)
+        grow = new_capacity - capacity
+        self.cells = np.concatenate([self.cells, np.zeros(grow, dtype=np.int64)])
+        self.latitudes = np.concatenate([self.latitudes, np.zeros(grow, dtype=np.float32)])
+        self.longitudes = np.concatenate([self.longitudes, np.zeros(grow, dtype=np.float32)])
+        self.counts = np.concatenate(
+            [self.counts, np.zeros((grow,) + self.counts.shape[1:], dtype=self.counts.dtype)]
+        )
+        self.level = np.concatenate([self.level, np.zeros((grow, self.level.shape[1]), dtype=np.float32)])
+        self.trend = np.concatenate([self.trend, np.zeros((grow, self.trend.shape[1]), dtype=np.float32)])
+
+    def _rows_for(self, cells: np.ndarray) -> np.ndarray:
+        unique_cells, inverse = np.unique(cells, return_inverse=True)
+        new_cells = [int(c) for c in unique_cells if int(c) not in self._cell_index]
+        if new_cells:
+            start = self.n_cells
+            self._ensure_capacity(start + len(new_cells))
+            new_array = np.array(new_cells, dtype=np.int64)
+            lat, lon = cell_centroids(new_array, self.precision)
+            self.cells[start:start + len(new_cells)] = new_array
+            self.latitudes[start:start + len(new_cells)] = lat
+            self.longitudes[start:start + len(new_cells)] = lon
+            for offset, cell in enumerate(new_cells):
+                self._cell_index[cell] = start + offset
+        unique_rows = np.array([self._cell_index[int(c)] for c in unique_cells], dtype=np.int64)
+        return unique_rows[inverse]
+
+    # Model fitting
+    def _close_day(self, day: int):
+        """Fold the finished day's counts into the level and seasonal factors"""
+        n = self.n_cells
+        dow = (day + 3) % 7  # 1970-01-01 was a Thursday; 0 = Monday
+        observed = self.counts[:n, day % self.history_days, :].astype(np.float32)
+        season = self.season[:, dow]
+
+        if self.days_fitted == 0:
+            self.level[:n] = observed / season
+        else:
+            previous = self.level[:n].copy()
+            projected = previous + self.damping * self.trend[:n]
+            self.level[:n] = np.maximum(0.0, self.alpha * (observed / season) + (1.0 - self.alpha) * projected)
+            self.trend[:n] = (
+                self.beta * (self.level[:n] - previous) + (1.0 - self.beta) * self.damping * self.trend[:n]
+            )
+
+            # Seasonal factor per category from city-wide totals, renormalised to mean 1
+            expected = self.level[:n].sum(axis=0)
+            actual = observed.sum(axis=0)
+            ratio = np.divide(actual, expected, out=season.copy(), where=expected > 0)
+            self.season[:, dow] = self.gamma * ratio + (1.0 - self.gamma) * season
+            self.season /= self.season.mean(axis=1, keepdims=True)
+
+        self.days_fitted += 1
+
+    def _reset_history(self, day: int):
+        """Start over after a gap longer than the window; the old state carries no signal"""
+        n = self.n_cells
+        self.counts[:n] = 0
+        self.level[:n] = 0.0
+        self.trend[:n] = 0.0
+        self.days_fitted = 0
+        self.current_day = day
+
+    def advance_to(self, day: int):
+        """Close every day before day, e.g. from a nightly job when no reports arrived"""
+        if self.current_day is None:
+            self.current_day = day
+            return
+        if day - self.current_day > self.history_days:
+            # Closing each empty day would only decay the level to zero; skip straight there
+            self._reset_history(day)
+            return
+        while self.current_day < day:
+            self._close_day(self.current_day)
+            self.current_day += 1
+            # The slot being reused holds counts from history_days ago
+            self.counts[:self.n_cells, self.current_day % self.history_days, :] = 0
+
+    def _fold_late(self, rows: np.ndarray, category_ids: np.ndarray, day: int):
+        """Apply reports for an already closed day to level and trend.
+
+        The smoother is linear apart from the clamp at zero, so the extra count
+        enters as it would have when the day closed and is then carried through
+        each day closed since: with no new innovation a perturbation in
+        (level, trend) evolves by [[1-a, (1-a)p], [-ab, p(1-ab)]].
+        """
+        n_categories = len(CATEGORIES)
+        late = np.zeros((rows.size, n_categories), dtype=np.float32)
+        np.add.at(late, (np.arange(rows.size), category_ids), 1.0)
+        unique_rows, inverse = np.unique(rows, return_inverse=True)
+        extra = np.zeros((unique_rows.size, n_categories), dtype=np.float32)
+        np.add.at(extra, inverse, late)
+
+        dow = (day + 3) % 7
+        a, b, phi = self.alpha, self.beta, self.damping
+        delta_level = a * extra / self.season[:, dow]
+        transition = np.array([[1 - a, (1 - a) * phi], [-a * b, phi * (1 - a * b)]])
+        carry = np.linalg.matrix_power(transition, self.current_day - 1 - day) @ np.array([1.0, b])
+
+        self.level[unique_rows] = np.maximum(0.0, self.level[unique_rows] + carry[0] * delta_level)
+        self.trend[unique_rows] += (carry[1] * delta_level).astype(np.float32)
+
+    def observe_batch(
+        self,
+        latitudes: Iterable[float],
+        longitudes: Iterable[float],
+        categories: Iterable[str],
+        days: Iterable[int],
+        today: Optional[int] = None
+    ) -> int:
+        """Add reports to the grid, closing any days that are now complete.
+
+        Returns the number of reports kept; reports more than MAX_FUTURE_DAYS
+        after today (server clock by default) or older than the retained
+        window are dropped.
+        """
+        latitudes = np.asarray(latitudes, dtype=np.float64)
+        longitudes = np.asarray(longitudes, dtype=np.float64)
+        days = np.asarray(days, dtype=np.int64)
+        category_ids = np.array([CATEGORY_INDEX.get(c, CATEGORY_INDEX["other"]) for c in categories], dtype=np.int64)
+
+        today = to_day(time.time()) if today is None else today
+        valid = days <= today + MAX_FUTURE_DAYS
+        # Ring slots older than the newest day's window have been (or are about to be) reused
+        newest = int(days[valid].max(initial=-1 if self.current_day is None else self.current_day))
+        valid &= days > newest - self.history_days
+        if not valid.all():
+            logger.warning(f"Dropped {int((~valid).sum())} reports dated outside the hotspot window")
+            latitudes, longitudes, category_ids, days = (
+                latitudes[valid], longitudes[valid], category_ids[valid], days[valid]
+            )
+        if days.size == 0:
+            return 0
+
+        rows = self._rows_for(geohash_cells(latitudes, longitudes, self.precision))
+
+        # Feed days in order so out-of-order batches still close each day exactly once
+        order = np.argsort(days, kind="stable")
+        rows, category_ids, days = rows[order], category_ids[order], days[order]
+        boundaries = np.flatnonzero(np.diff(days)) + 1
+        for start, end in zip(np.r_[0, boundaries], np.r_[boundaries, days.size]):
+            day = int(days[start])
+            if self.current_day is not None and day < self.current_day:
+                self._fold_late(rows[start:end], category_ids[start:end], day)
+            else:
+                self.advance_to(day)
+            np.add.at(self.counts, (rows[start:end], day % self.history_days, category_ids[start:end]), 1)
+
+        self.is_loaded = True
+        self.last_updated = datetime.now(timezone.utc).isoformat()
+        return int(days.size)
+
+    def observe(self, reports: List[Dict[str, Any]]) -> int:
+        """Ingest report dicts with latitude, longitude, category and created_at"""
+        if not reports:
+            return 0
+        return self.observe_batch(
+            [r["latitude"] for r in reports],
+            [r["longitude"] for r in reports],
+            [r.get("category", "other") for r in reports],
+            [to_day(r.get("created_at", time.time())) for r in reports]
+        )
+
+    # Prediction
+    def expected_counts(self, horizon_days: int, start_day: Optional[int] = None) -> np.ndarray:
+        """Expected reports per cell and category over the next horizon_days"""
+        start_day = (self.current_day + 1) if start_day is None else start_day
+        dows = (np.arange(start_day, start_day + horizon_days) + 3) % 7
+        seasonal_total = self.season[:, dows].sum(axis=1)
+        # Damped trend: step h contributes damping + damping^2 + ... + damping^h
+        steps = np.arange(1, horizon_days + 1)
+        damped = np.cumsum(self.damping ** steps)
+        trend_total = (self.season[:, dows] * damped).sum(axis=1)
+        n = self.n_cells
+        return np.maximum(0.0, self.level[:n] * seasonal_total + self.trend[:n] * trend_total)
+
+    def predict(
+        self,
+        min_lat: float,
+        min_lon: float,
+        max_lat: float,
+        max_lon: float,
+        horizon_days: int = 7,
+        category: Optional[str] = None,
+        limit: int = 20,
+        min_expected: float = 0.5
+    ) -> Dict[str, Any]:
+        if not 1 <= horizon_days <= MAX_HORIZON_DAYS:
+            raise ValueError(f"horizon_days must be between 1 and {MAX_HORIZON_DAYS}")
+        if not 1 <= limit <= MAX_PREDICTION_LIMIT:
+            raise ValueError(f"limit must be between 1 and {MAX_PREDICTION_LIMIT}")
+
+        n = self.n_cells
+        if n == 0 or self.current_day is None:
+            return {"predicted_hotspots": [], "confidence": 0.0, "prediction_horizon_days": horizon_days}
+
+        lat, lon = self.latitudes[:n], self.longitudes[:n]
+        in_box = np.flatnonzero((lat >= min_lat) & (lat <= max_lat) & (lon >= min_lon) & (lon <= max_lon))
+
+        expected = self.expected_counts(horizon_days)[in_box]
+        if category is not None:
+            scores = expected[:, CATEGORY_INDEX[category]]
+        else:
+            scores = expected.sum(axis=1)
+
+        keep = np.flatnonzero(scores >= min_expected)
+        if keep.size > limit:
+            keep = keep[np.argpartition(-scores[keep], limit - 1)[:limit]]
+        keep = keep[np.argsort(-scores[keep])]
+
+        hotspots = []
+        for i in keep:
+            row = in_box[i]
+            hotspots.append({
+                "geohash": cell_to_geohash(int(self.cells[row]), self.precision),
+                "latitude": float(lat[row]),
+                "longitude": float(lon[row]),
+                "expected_reports": round(float(scores[i]), 2),
+                "dominant_category": CATEGORIES[int(expected[i].argmax())],
+                "by_category": {
+                    name: round(float(value), 2) for name, value in zip(CATEGORIES, expected[i]) if value > 0
+                }
+            })
+
+        return {
+            "predicted_hotspots": hotspots,
+            # Confidence grows as the smoother sees full weekly cycles
+            "confidence": round(min(1.0, self.days_fitted / 28.0), 2),
+            "prediction_horizon_days": horizon_days
+        }
+
+    # Persistence
+    def state(self) -> Dict[str, np.ndarray]:
+        """Copy of the grid that can be written from another thread while ingestion continues"""
+        n = self.n_cells
+        return {
+            "cells": self.cells[:n].copy(),
+            "counts": self.counts[:n].copy(),
+            "level": self.level[:n].copy(),
+            "trend": self.trend[:n].copy(),
+            "season": self.season.copy(),
+            "state": np.array([self.current_day if self.current_day is not None else -1, self.days_fitted]),
+            "params": np.array([self.precision, self.history_days]),
+        }
+
+    @staticmethod
+    def write_state(path: str, state: Dict[str, np.ndarray]):
+        """Write atomically so a crash mid-checkpoint keeps the previous file"""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        temporary = f"{path}.tmp.npz"
+        np.savez_compressed(temporary, **state)
+        os.replace(temporary, path)
+
+    def save(self, path: str):
+        self.write_state(path, self.state())
+
+    def load(self, path: str) -> bool:
+        if not os.path.exists(path):
+            return False
+        with np.load(path) as data:
+            precision, history_days = (int(v) for v in data["params"])
+            if precision != self.precision or history_days != self.history_days:
+                logger.warning("Hotspot model on disk uses different grid parameters; ignoring it")
+                return False
+            cells = data["cells"]
+            n = len(cells)
+            self._ensure_capacity(n)
+            self.cells[:n] = cells
+            self.latitudes[:n], self.longitudes[:n] = cell_centroids(cells, self.precision)
+            self._cell_index = {int(cell): row for row, cell in enumerate(cells)}
+            self.counts[:n] = data["counts"]
+            self.level[:n] = data["level"]
+            self.trend[:n] = data["trend"]
+            self.season[:] = data["season"]
+            current_day, self.days_fitted = (int(v) for v in data["state"])
+            self.current_day = None if current_day < 0 else current_day
+        self.is_loaded = n > 0
+        self.last_updated = datetime.now(timezone.utc).isoformat()
+        return True
@@ -0,0 +1,149 @@
+"""Backtest and latency benchmark for the hotspot engine on a synthetic city.
+
+Exits non-zero when the forecast is no better than repeating last week.
+Run from the ml-services directory:
+
+    python -m benchmarks.hotspot_backtest --days 84 --holdout 7
+"""
+import argparse
+import json
+import sys
+import time
+
+import numpy as np
+
+from app.services.hotspot_engine import CATEGORIES, HotspotEngine, geohash_cells
+
+# 2020-01-06 is a Monday, so day-of-week effects line up with the engine
+START_DAY = 18267
+
+# Relative report volume Monday..Sunday for each category
+WEEKLY_PROFILE = {
+    "pothole": [1.1, 1.1, 1.0, 1.0, 1.0, 0.9, 0.9],
+    "garbage": [1.4, 1.0, 0.9, 0.9, 1.0, 0.9, 0.9],
+    "streetlight": [0.9, 0.9, 0.9, 1.0, 1.1, 1.1, 1.1],
+    "water": [1.0, 1.0, 1.0, 1.0, 1.0, 1.0, 1.0],
+    "road": [1.2, 1.1, 1.0, 1.0, 1.0, 0.8, 0.9],
+    "other": [1.0, 1.0, 1.0, 1.0, 1.0, 1.0, 1.0],
+}
+
+
+def synthetic_city(days: int, hotspots: int, seed: int, center=(28.6139, 77.2090), spread=0.15):
+    """Daily report batches from clustered hotspots with weekly seasonality and drift"""
+    rng = np.random.default_rng(seed)
+    centers = np.column_stack([
+        center[0] + rng.uniform(-spread, spread, hotspots),
+        center[1] + rng.uniform(-spread, spread, hotspots),
+    ])
+    base_rates = rng.gamma(shape=1.5, scale=1.2, size=(hotspots, len(CATEGORIES)))
+    # Some hotspots grow or fade over the simulation
+    trends = rng.normal(0.0, 0.01, hotspots)
+    weekly = np.array([WEEKLY_PROFILE[c] for c in CATEGORIES])
+
+    batches = []
+    for d in range(days):
+        day = START_DAY + d
+        dow = (day + 3) % 7
+        rates = base_rates * np.exp(trends * d)[:, None] * weekly[:, dow][None, :]
+        counts = rng.poisson(rates)
+        hotspot_ids, category_ids = np.nonzero(counts)
+        repeats = counts[hotspot_ids, category_ids]
+        hotspot_ids = np.repeat(hotspot_ids, repeats)
+        category_ids = np.repeat(category_ids, repeats)
+        latitudes = centers[hotspot_ids, 0] + rng.normal(0, 0.002, hotspot_ids.size)
+        longitudes = centers[hotspot_ids, 1] + rng.normal(0, 0.002, hotspot_ids.size)
+
+        # Background noise spread across the whole city
+        noise = rng.poisson(hotspots * 0.2)
+        latitudes = np.r_[latitudes, center[0] + rng.uniform(-spread, spread, noise)]
+        longitudes = np.r_[longitudes, center[1] + rng.uniform(-spread, spread, noise)]
+        category_ids = np.r_[category_ids, rng.integers(0, len(CATEGORIES), noise)]
+
+        batches.append((day, latitudes, longitudes, np.array(CATEGORIES)[category_ids]))
+    return batches
+
+
+def cell_totals(engine: HotspotEngine, batches) -> np.ndarray:
+    totals = np.zeros(engine.n_cells)
+    for _, latitudes, longitudes, _ in batches:
+        cells = geohash_cells(latitudes, longitudes, engine.precision)
+        rows = np.array([engine._cell_index.get(int(c), -1) for c in cells])
+        np.add.at(totals, rows[rows >= 0], 1)
+    return totals
+
+
+def top_k_overlap(predicted: np.ndarray, actual: np.ndarray, k: int) -> float:
+    top_predicted = set(np.argsort(-predicted)[:k])
+    top_actual = set(np.argsort(-actual)[:k])
+    return len(top_predicted & top_actual) / k
+
+
+def percentile_ms(samples, q):
+    return round(float(np.percentile(samples, q)) * 1000, 3)
+
+
+def run(days: int, holdout: int, hotspots: int, queries: int, seed: int) -> dict:
+    batches = synthetic_city(days, hotspots, seed)
+    train, test = batches[:-holdout], batches[-holdout:]
+
+    engine = HotspotEngine()
+    reports = 0
+    started = time.perf_counter()
+    for day, latitudes, longitudes, categories in train:
+        reports += engine.observe_batch(latitudes, longitudes, categories, np.full(latitudes.size, day))
+    # Close the last training day so the forecast starts on the first holdout day
+    engine.advance_to(train[-1][0] + 1)
+    ingest_seconds = time.perf_counter() - started
+
+    predicted = engine.expected_counts(holdout, start_day=test[0][0]).sum(axis=1)
+    actual = cell_totals(engine, test)
+
+    # Naive baseline: repeat the mean of the last week of training
+    last_week = cell_totals(engine, train[-7:]) / 7 * holdout
+
+    rng = np.random.default_rng(seed + 1)
+    latencies = []
+    for _ in range(queries):
+        lat0, lon0 = 28.6139 + rng.uniform(-0.15, 0.1), 77.2090 + rng.uniform(-0.15, 0.1)
+        size = rng.uniform(0.02, 0.1)
+        t = time.perf_counter()
+        engine.predict(lat0, lon0, lat0 + size, lon0 + size, horizon_days=holdout)
+        latencies.append(time.perf_counter() - t)
+
+    return {
+        "reports_ingested": reports,
+        "cells": engine.n_cells,
+        "ingest_reports_per_second": round(reports / ingest_seconds),
+        "mae_model": round(float(np.abs(predicted - actual).mean()), 4),
+        "mae_naive_last_week": round(float(np.abs(last_week - actual).mean()), 4),
+        "top20_overlap_model": top_k_overlap(predicted, actual, 20),
+        "top20_overlap_naive": top_k_overlap(last_week, actual, 20),
+        "predict_p50_ms": percentile_ms(latencies, 50),
+        "predict_p95_ms": percentile_ms(latencies, 95),
+        "predict_p99_ms": percentile_ms(latencies, 99),
+        "grid_bytes": int(engine.counts.nbytes + engine.level.nbytes),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--days", type=int, default=84)
+    parser.add_argument("--holdout", type=int, default=7)
+    parser.add_argument("--hotspots", type=int, default=400)
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="Write the results as JSON to this path")
+    args = parser.parse_args()
+
+    results = run(args.days, args.holdout, args.hotspots, args.queries, args.seed)
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    if results["mae_model"] >= results["mae_naive_last_week"]:
+        print("FAIL: model does not beat the naive last-week baseline")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+import os
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import sessionmaker
+from geoalchemy2 import Geometry
+
+from app.config import settings
+from app.database import Base
+
+# Tests run against SQLite unless TEST_DATABASE_URL points at a PostGIS database.
+# SQLite stores UUIDs as hex strings and geometries as opaque blobs; SKIP LOCKED
+# is dropped by its compiler, so concurrent claiming is only exercised on PostgreSQL.
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL", "sqlite://")
+
+# Spatialite functions GeoAlchemy emits on SQLite; tests never query geometry, so
+# admin calls are no-ops and geometry values pass through unchanged
+SPATIALITE_FUNCTIONS = {
+    "RecoverGeometryColumn": lambda *args: 1,
+    "CreateSpatialIndex": lambda *args: 1,
+    "CheckSpatialIndex": lambda *args: 1,
+    "DiscardGeometryColumn": lambda *args: 1,
+    "DisableSpatialIndex": lambda *args: 1,
+    "GeomFromEWKT": lambda value, *args: value,
+    "AsEWKB": lambda value, *args: value,
+}
+
+
+@compiles(UUID, "sqlite")
+def _compile_uuid_sqlite(type_, compiler, **kw):
+    return "CHAR(32)"
+
+
+@compiles(Geometry, "sqlite")
+def _compile_geometry_sqlite(type_, compiler, **kw):
+    return "BLOB"
+
+
+@pytest.fixture
+def engine():
+    if TEST_DATABASE_URL.startswith("sqlite"):
+        from sqlalchemy.pool import StaticPool
+
+        engine = create_engine(
+            TEST_DATABASE_URL, connect_args={"check_same_thread": False}, poolclass=StaticPool
+        )
+
+        @event.listens_for(engine, "connect")
+        def _register_spatial_noops(dbapi_connection, _):
+            for name, function in SPATIALITE_FUNCTIONS.items():
+                dbapi_connection.create_function(name, -1, function)
+    else:
+        engine = create_engine(TEST_DATABASE_URL)
+
+    Base.metadata.create_all(engine)
+    yield engine
+    Base.metadata.drop_all(engine)
+    engine.dispose()
+
+
+@pytest.fixture
+def session_factory(engine):
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+@pytest.fixture
+def notification_settings(monkeypatch):
+    """Credentials for both channels so the outbox queues SMS and email"""
+    monkeypatch.setattr(settings, "TWILIO_ACCOUNT_SID", "AC123")
+    monkeypatch.setattr(settings, "TWILIO_AUTH_TOKEN", "token")
+    monkeypatch.setattr(settings, "TWILIO_FROM_NUMBER", "+15550000000")
+    monkeypatch.setattr(settings, "EMAIL_FROM", "noreply@civic.example")
+    monkeypatch.setattr(settings, "EMAIL_USERNAME", None)
+    monkeypatch.setattr(settings, "EMAIL_PASSWORD", None)
+    monkeypatch.setattr(settings, "SMTP_USE_TLS", False)
+    return settings
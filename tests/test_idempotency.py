@@ -0,0 +1,168 @@
+import asyncio
+import time
+
+import pytest
+
+from app.services import idempotency
+from app.services.idempotency import (
+    EXTEND_LOCK_SCRIPT, RELEASE_LOCK_SCRIPT, IdempotencyInProgress, IdempotencyStore
+)
+
+
+class FakeRedis:
+    """Shared in-memory stand-in for the Redis commands the store uses; expiry is not modelled"""
+
+    def __init__(self):
+        self.values = {}
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.values:
+            return None
+        self.values[key] = value
+        return True
+
+    async def eval(self, script, numkeys, key, token, *args):
+        if self.values.get(key) != token:
+            return 0
+        if script == RELEASE_LOCK_SCRIPT:
+            del self.values[key]
+        elif script != EXTEND_LOCK_SCRIPT:
+            raise NotImplementedError(script)
+        return 1
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    """None runs the store on its in-process fallback; tests may swap in a FakeRedis"""
+    state = {"client": None}
+
+    async def get_redis():
+        return state["client"]
+
+    monkeypatch.setattr(idempotency, "get_redis", get_redis)
+    return state
+
+
+def recording_handler(calls, response=None, started=None, delay=0.0, error=None):
+    async def handler():
+        calls.append(response)
+        if started is not None:
+            started.set()
+        await asyncio.sleep(delay)
+        if error is not None:
+            raise error
+        return response
+    return handler
+
+
+@pytest.mark.asyncio
+async def test_concurrent_duplicates_run_the_handler_once(redis):
+    store = IdempotencyStore(ttl_seconds=60, lock_seconds=5)
+    calls = []
+    handler = recording_handler(calls, {"id": 1}, delay=0.05)
+
+    responses = await asyncio.gather(*(store.run("k", "fp", handler) for _ in range(5)))
+
+    assert responses == [{"id": 1}] * 5
+    assert len(calls) == 1
+    assert await store.run("k", "fp", handler) == {"id": 1}
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_waiter_takes_over_when_the_owner_is_cancelled(redis):
+    store = IdempotencyStore(ttl_seconds=60, lock_seconds=5)
+    calls, started = [], asyncio.Event()
+    owner = asyncio.create_task(store.run("k", "fp", recording_handler(calls, {"id": 1}, started, delay=10)))
+    await started.wait()
+    waiter = asyncio.create_task(store.run("k", "fp", recording_handler(calls, {"id": 2})))
+    await asyncio.sleep(0)
+
+    owner.cancel()
+
+    assert await asyncio.wait_for(waiter, 1) == {"id": 2}
+    assert owner.cancelled()
+    assert calls == [{"id": 1}, {"id": 2}]
+    assert await store.run("k", "fp", recording_handler(calls, {"id": 3})) == {"id": 2}
+
+
+@pytest.mark.asyncio
+async def test_waiter_takes_over_when_the_owner_fails(redis):
+    store = IdempotencyStore(ttl_seconds=60, lock_seconds=5)
+    calls, started = [], asyncio.Event()
+    owner = asyncio.create_task(
+        store.run("k", "fp", recording_handler(calls, started=started, delay=0.05, error=RuntimeError("boom")))
+    )
+    await started.wait()
+    waiters = [asyncio.create_task(store.run("k", "fp", recording_handler(calls, {"id": 2}))) for _ in range(3)]
+
+    with pytest.raises(RuntimeError):
+        await owner
+    assert await asyncio.gather(*waiters) == [{"id": 2}] * 3
+    # The waiters coalesce again: one takes over, the rest share its result
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_leaves_the_owner_running(redis):
+    store = IdempotencyStore(ttl_seconds=60, lock_seconds=5)
+    calls, started = [], asyncio.Event()
+    owner = asyncio.create_task(store.run("k", "fp", recording_handler(calls, {"id": 1}, started, delay=0.05)))
+    await started.wait()
+    waiter = asyncio.create_task(store.run("k", "fp", recording_handler(calls, {"id": 2})))
+    await asyncio.sleep(0)
+
+    waiter.cancel()
+
+    assert await owner == {"id": 1}
+    assert waiter.cancelled()
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_remote_waiter_replays_the_stored_result(redis):
+    redis["client"] = FakeRedis()
+    worker_a = IdempotencyStore(ttl_seconds=60, lock_seconds=5)
+    worker_b = IdempotencyStore(ttl_seconds=60, lock_seconds=5)
+    calls, started = [], asyncio.Event()
+    first = asyncio.create_task(worker_a.run("k", "fp", recording_handler(calls, {"id": 1}, started, delay=0.2)))
+    await started.wait()
+
+    assert await worker_b.run("k", "fp", recording_handler(calls, {"id": 2})) == {"id": 1}
+    assert await first == {"id": 1}
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_remote_waiter_acquires_the_lock_when_the_holder_fails(redis):
+    redis["client"] = FakeRedis()
+    worker_a = IdempotencyStore(ttl_seconds=60, lock_seconds=5)
+    worker_b = IdempotencyStore(ttl_seconds=60, lock_seconds=5)
+    calls, started = [], asyncio.Event()
+    first = asyncio.create_task(
+        worker_a.run("k", "fp", recording_handler(calls, started=started, delay=0.2, error=RuntimeError("boom")))
+    )
+    await started.wait()
+
+    began = time.monotonic()
+    assert await worker_b.run("k", "fp", recording_handler(calls, {"id": 2})) == {"id": 2}
+    assert time.monotonic() - began < 1  # well inside the 5 s lock window
+    with pytest.raises(RuntimeError):
+        await first
+    assert len(calls) == 2
+    assert "idempotency-lock:k" not in redis["client"].values
+
+
+@pytest.mark.asyncio
+async def test_remote_waiter_gives_up_while_the_holder_is_alive(redis):
+    redis["client"] = FakeRedis()
+    redis["client"].values["idempotency-lock:k"] = "other-worker"
+    store = IdempotencyStore(ttl_seconds=60, lock_seconds=0.3)
+    calls = []
+
+    with pytest.raises(IdempotencyInProgress):
+        await store.run("k", "fp", recording_handler(calls, {"id": 1}))
+    assert calls == []
@@ -0,0 +1,209 @@
+import socket
+import uuid
+from datetime import datetime, timedelta
+
+import httpx
+import pytest
+from aiosmtpd.controller import Controller
+
+from app.database import NotificationOutbox
+from app.services.notification_dispatcher import EmailSender, NotificationDispatcher, SmsSender
+
+
+class RecordingSmtpHandler:
+    """Local SMTP stand-in that records messages and how many sessions delivered them"""
+
+    def __init__(self):
+        self.messages = []
+        self.sessions = set()
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages.append((envelope.rcpt_tos, envelope.content.decode()))
+        self.sessions.add(id(session))
+        return "250 OK"
+
+
+class FailingSender:
+    def __init__(self, error="provider unavailable"):
+        self.error = error
+        self.batches = []
+
+    async def send_batch(self, notifications):
+        self.batches.append(notifications)
+        return [(n.id, self.error) for n in notifications]
+
+    async def close(self):
+        pass
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def smtp_server(notification_settings, monkeypatch):
+    handler = RecordingSmtpHandler()
+    controller = Controller(handler, hostname="127.0.0.1", port=free_port())
+    controller.start()
+    monkeypatch.setattr(notification_settings, "SMTP_SERVER", controller.hostname)
+    monkeypatch.setattr(notification_settings, "SMTP_PORT", controller.port)
+    yield handler
+    controller.stop()
+
+
+@pytest.fixture
+def twilio():
+    """httpx transport standing in for the Twilio Messages API"""
+    requests = []
+
+    def handle(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(201, json={"sid": f"SM{len(requests)}"})
+
+    return requests, httpx.MockTransport(handle)
+
+
+def sms_sender(transport) -> SmsSender:
+    sender = SmsSender(concurrency=4)
+    sender._client = httpx.AsyncClient(base_url="https://twilio.test", transport=transport)
+    return sender
+
+
+def queue(session_factory, *rows):
+    db = session_factory()
+    try:
+        for channel, recipient, message in rows:
+            db.add(NotificationOutbox(
+                channel=channel, recipient=recipient, message=message,
+                subject="Update" if channel == "email" else None,
+                dedup_key=f"test:{uuid.uuid4()}"
+            ))
+        db.commit()
+    finally:
+        db.close()
+
+
+def rows_by_recipient(session_factory):
+    db = session_factory()
+    try:
+        return {row.recipient: row for row in db.query(NotificationOutbox).all()}
+    finally:
+        db.close()
+
+
+def test_claim_leases_rows_until_the_lease_expires(session_factory):
+    queue(session_factory, ("sms", "+15550000001", "one"), ("sms", "+15550000002", "two"))
+    dispatcher = NotificationDispatcher(session_factory=session_factory, batch_size=10)
+
+    claimed = dispatcher._claim_batch()
+    assert len(claimed) == 2
+    assert all(n.attempts == 1 for n in claimed)
+    assert dispatcher._claim_batch() == []
+
+    rows = rows_by_recipient(session_factory)
+    lease_end = datetime.utcnow() + timedelta(seconds=NotificationDispatcher.LEASE_SECONDS)
+    for row in rows.values():
+        assert row.status == "sending"
+        assert abs((row.next_attempt_at - lease_end).total_seconds()) < 5
+
+    # A worker that died mid-send leaves its rows claimable once the lease runs out
+    db = session_factory()
+    db.query(NotificationOutbox).update({"next_attempt_at": datetime.utcnow() - timedelta(seconds=1)})
+    db.commit()
+    db.close()
+    reclaimed = dispatcher._claim_batch()
+    assert len(reclaimed) == 2
+    assert all(n.attempts == 2 for n in reclaimed)
+
+
+def test_claim_respects_batch_size(session_factory):
+    queue(session_factory, *[("sms", f"+1555000000{i}", "hello") for i in range(5)])
+    dispatcher = NotificationDispatcher(session_factory=session_factory, batch_size=3)
+
+    assert len(dispatcher._claim_batch()) == 3
+    assert len(dispatcher._claim_batch()) == 2
+
+
+@pytest.mark.asyncio
+async def test_failed_sends_back_off_then_fail_permanently(session_factory):
+    queue(session_factory, ("sms", "+15550000001", "hello"))
+    sender = FailingSender()
+    dispatcher = NotificationDispatcher(session_factory=session_factory, sms_sender=sender, max_attempts=2)
+
+    assert await dispatcher.dispatch_once() == 1
+    row = rows_by_recipient(session_factory)["+15550000001"]
+    assert row.status == "pending"
+    assert row.last_error == "provider unavailable"
+    backoff = (row.next_attempt_at - datetime.utcnow()).total_seconds()
+    assert NotificationDispatcher.BACKOFF_BASE_SECONDS - 5 < backoff <= NotificationDispatcher.BACKOFF_BASE_SECONDS
+    assert await dispatcher.dispatch_once() == 0  # still backing off
+
+    db = session_factory()
+    db.query(NotificationOutbox).update({"next_attempt_at": datetime.utcnow()})
+    db.commit()
+    db.close()
+
+    assert await dispatcher.dispatch_once() == 1
+    row = rows_by_recipient(session_factory)["+15550000001"]
+    assert row.status == "failed"
+    assert row.attempts == 2
+    assert dispatcher.metrics.retried == 1
+    assert dispatcher.metrics.failed == 1
+
+
+@pytest.mark.asyncio
+async def test_sms_batch_is_sent_concurrently_and_deduplicated(notification_settings, session_factory, twilio):
+    requests, transport = twilio
+    queue(
+        session_factory,
+        ("sms", "+15550000001", "Your report has been resolved."),
+        ("sms", "+15550000001", "Your report has been resolved."),
+        ("sms", "+15550000002", "Your report is being worked on."),
+    )
+    dispatcher = NotificationDispatcher(
+        session_factory=session_factory, sms_sender=sms_sender(transport), email_sender=EmailSender()
+    )
+
+    assert await dispatcher.dispatch_once() == 3
+    await dispatcher.close()
+
+    assert len(requests) == 2
+    assert {r.url.path for r in requests} == {"/2010-04-01/Accounts/AC123/Messages.json"}
+    bodies = sorted(r.content.decode() for r in requests)
+    assert "To=%2B15550000001" in bodies[0] and "From=%2B15550000000" in bodies[0]
+    assert all(row.status == "sent" for row in rows_by_recipient(session_factory).values())
+    assert dispatcher.metrics.deduplicated == 1
+    assert dispatcher.metrics.sent == 2
+
+
+@pytest.mark.asyncio
+async def test_email_batch_reuses_one_smtp_session(smtp_server, session_factory, twilio):
+    _, transport = twilio
+    queue(session_factory, *[("email", f"citizen{i}@example.com", f"Update {i}") for i in range(3)])
+    dispatcher = NotificationDispatcher(session_factory=session_factory, sms_sender=sms_sender(transport))
+
+    assert await dispatcher.dispatch_once() == 3
+    await dispatcher.close()
+
+    assert sorted(rcpt for rcpts, _ in smtp_server.messages for rcpt in rcpts) == [
+        "citizen0@example.com", "citizen1@example.com", "citizen2@example.com"
+    ]
+    assert len(smtp_server.sessions) == 1
+    assert all("From: noreply@civic.example" in content for _, content in smtp_server.messages)
+    assert dispatcher.metrics.by_channel["email"] == 3
+
+
+@pytest.mark.asyncio
+async def test_mixed_batch_records_per_channel_results(smtp_server, session_factory):
+    queue(session_factory, ("email", "citizen@example.com", "Update"), ("sms", "+15550000001", "Update"))
+    dispatcher = NotificationDispatcher(session_factory=session_factory, sms_sender=FailingSender("HTTP 500"))
+
+    assert await dispatcher.dispatch_once() == 2
+    await dispatcher.close()
+
+    rows = rows_by_recipient(session_factory)
+    assert rows["citizen@example.com"].status == "sent"
+    assert rows["+15550000001"].status == "pending"
+    assert rows["+15550000001"].last_error == "HTTP 500"
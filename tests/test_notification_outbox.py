@@ -0,0 +1,96 @@
+import pytest
+from sqlalchemy import event
+
+from app.database import NotificationOutbox, Report, StatusUpdate, User
+from app.services.notification_outbox import _queue_status_notifications, install_outbox_listener, outbox_stats
+
+
+@pytest.fixture
+def outbox_listener(session_factory):
+    install_outbox_listener(session_factory)
+    yield
+    # The event registry is keyed by object id, which a later test's sessionmaker may reuse
+    event.remove(session_factory, "before_flush", _queue_status_notifications)
+
+
+@pytest.fixture
+def report(session_factory, outbox_listener):
+    db = session_factory()
+    user = User(phone_number="+15551234567", email="citizen@example.com", name="Citizen")
+    report = Report(title="Broken streetlight", description="Dark street", category="streetlight",
+                    latitude=28.61, longitude=77.21, reporter=user)
+    db.add(report)
+    db.commit()
+    report_id = report.id
+    db.close()
+    return report_id
+
+
+def update_status(session_factory, report_id, new_status, old_status="submitted", commit=True):
+    db = session_factory()
+    status_update = StatusUpdate(report_id=report_id, old_status=old_status, new_status=new_status)
+    db.add(status_update)
+    if commit:
+        db.commit()
+    else:
+        db.flush()
+        db.rollback()
+    status_update_id = status_update.id
+    db.close()
+    return status_update_id
+
+
+def outbox_rows(session_factory):
+    db = session_factory()
+    try:
+        return db.query(NotificationOutbox).order_by(NotificationOutbox.channel).all()
+    finally:
+        db.close()
+
+
+def test_status_change_queues_one_row_per_channel(notification_settings, session_factory, report):
+    status_update_id = update_status(session_factory, report, "resolved")
+
+    rows = outbox_rows(session_factory)
+    assert [(row.channel, row.recipient) for row in rows] == [
+        ("email", "citizen@example.com"),
+        ("sms", "+15551234567"),
+    ]
+    assert {row.dedup_key for row in rows} == {
+        f"status:{status_update_id}:email",
+        f"status:{status_update_id}:sms",
+    }
+    assert all(row.status == "pending" and "has been resolved" in row.message for row in rows)
+
+
+def test_outbox_rows_roll_back_with_the_status_update(notification_settings, session_factory, report):
+    update_status(session_factory, report, "resolved", commit=False)
+
+    assert outbox_rows(session_factory) == []
+
+
+def test_unchanged_status_queues_nothing(notification_settings, session_factory, report):
+    update_status(session_factory, report, "submitted")
+
+    assert outbox_rows(session_factory) == []
+
+
+def test_unconfigured_channels_are_not_queued(notification_settings, monkeypatch, session_factory, report):
+    monkeypatch.setattr(notification_settings, "TWILIO_AUTH_TOKEN", None)
+
+    update_status(session_factory, report, "assigned")
+
+    assert [row.channel for row in outbox_rows(session_factory)] == ["email"]
+
+
+def test_outbox_stats_counts_pending_rows(notification_settings, session_factory, report):
+    update_status(session_factory, report, "verified")
+
+    db = session_factory()
+    try:
+        stats = outbox_stats(db)
+    finally:
+        db.close()
+    assert stats["by_channel"] == {"email": {"pending": 1}, "sms": {"pending": 1}}
+    assert stats["pending"] == 2
+    assert stats["failed"] == 0